@@ -2,14 +2,20 @@ from flask import Flask
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from config import Config
+from services import json_provider, metrics
 
 app = Flask(__name__)
 app.config.from_object(Config)
 app.config['JWT_SECRET_KEY'] = Config.JWT_SECRET_KEY
 
+json_provider.init_app(app)
+
 CORS(app, origins=['http://localhost:3000'], supports_credentials=True)
 jwt = JWTManager(app)
 
+if Config.METRICS_ENABLED:
+    metrics.init_app(app)
+
 from routes.auth_routes import auth_bp
 from routes.student_routes import student_bp
 from routes.dashboard_routes import dashboard_bp
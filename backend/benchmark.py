@@ -0,0 +1,306 @@
+"""
+Benchmarks reproducibles de la importación y del dashboard
+
+    python benchmark.py                                  10k filas, CSV y XLSX, almacén en memoria
+    python benchmark.py --sizes 10000,100000,1000000     varios tamaños
+    python benchmark.py --backend mysql                  contra la base de Config (usar una base de pruebas)
+    python benchmark.py --error-rate 0.05 --duplicate-ratio 0.02 --repeat 5 --output resultado.json
+
+Genera planillas sintéticas con una semilla fija, mide validate_excel_file,
+insert_students, get_students_statistics y los endpoints de listado, y
+escribe un JSON con rendimiento (filas/s), latencias p50/p99 y RSS máximo
+del proceso para comparar entre commits.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+from models.student_model import StudentModel
+from controllers.student_controller import StudentController
+from services.cache import response_cache
+from services.file_readers import read_upload, select_reader
+from services.json_provider import orjson
+
+def generate_roster(rows: int, error_rate: float = 0.0, duplicate_ratio: float = 0.0,
+                    seed: int = 0, prefix: str = 'bench') -> pd.DataFrame:
+    """
+    Planilla sintética con las columnas que espera validate_excel_file.
+    error_rate es la fracción de filas con un valor inválido y duplicate_ratio
+    la fracción de filas que repiten el nombre y NUE de otra fila del archivo.
+    """
+    rng = np.random.default_rng(seed)
+    current_year = datetime.now().year
+    graduado = rng.random(rows) < 0.3
+    promedio = np.round(rng.uniform(6, 10, rows), 2)
+
+    df = pd.DataFrame({
+        'nombre_estudiante': [f'{prefix} {seed}-{i}' for i in range(rows)],
+        'anio_inicio': rng.integers(current_year - 10, current_year + 1, rows).astype(object),
+        'NUE': (np.arange(rows, dtype=np.int64) + seed * 10_000_000 + 1_000_000_000).astype(object),
+        'estado': np.where(graduado, 'graduado', 'activo'),
+        'promedio_actual': promedio.astype(object),
+        'promedio_graduacion': np.where(graduado, promedio, np.nan).astype(object)
+    })
+
+    duplicates = rng.choice(rows, int(rows * duplicate_ratio), replace=False) if rows else []
+    for index in duplicates:
+        source = rng.integers(0, rows)
+        df.at[index, 'nombre_estudiante'] = df.at[source, 'nombre_estudiante']
+        df.at[index, 'NUE'] = df.at[source, 'NUE']
+
+    # Un error por fila afectada, repartido entre los tipos que reporta la validación
+    invalid = rng.choice(rows, int(rows * error_rate), replace=False) if rows else []
+    for kind, index in enumerate(invalid):
+        kind %= 5
+        if kind == 0:
+            df.at[index, 'nombre_estudiante'] = np.nan
+        elif kind == 1:
+            df.at[index, 'anio_inicio'] = current_year + 1
+        elif kind == 2:
+            df.at[index, 'NUE'] = 'sin-nue'
+        elif kind == 3:
+            df.at[index, 'promedio_actual'] = 'n/a'
+        else:
+            df.at[index, 'estado'] = 'graduado'
+            df.at[index, 'promedio_graduacion'] = df.at[index, 'promedio_actual'] - 1
+
+    return df
+
+def write_roster(df: pd.DataFrame, file_format: str, directory: str) -> str:
+    path = os.path.join(directory, f'roster_{len(df)}.{file_format}')
+    if file_format == 'csv':
+        df.to_csv(path, index=False)
+    else:
+        df.to_excel(path, index=False)
+    return path
+
+class MemoryStudentStore:
+    """
+    Sustituto en memoria de las consultas de StudentModel que usan los
+    benchmarks; mide el costo de la aplicación sin un servidor MySQL
+    """
+
+    def __init__(self):
+        self.students = []
+        self.nombres = set()
+        self.nues = set()
+
+    def install(self) -> None:
+        StudentModel.find_existing_keys = staticmethod(self.find_existing_keys)
+        StudentModel.create_students_bulk = staticmethod(self.create_students_bulk)
+        StudentModel.get_students_statistics = staticmethod(self.get_students_statistics)
+        StudentModel.get_students_page = staticmethod(self.get_students_page)
+
+    def find_existing_keys(self, nombres, nues, batch_size=None):
+        return self.nombres.intersection(nombres), self.nues.intersection(nues)
+
+    def create_students_bulk(self, students, chunk_size=None, on_insert=None):
+        inserted = 0
+        errors = []
+        for student in students:
+            if student['nombre_estudiante'] in self.nombres or student['nue'] in self.nues:
+                errors.append({'student': student['nombre_estudiante'], 'error': 'Duplicate entry'})
+                continue
+            self.students.append(dict(student, id=len(self.students) + 1))
+            self.nombres.add(student['nombre_estudiante'])
+            self.nues.add(student['nue'])
+            inserted += 1
+        if on_insert and inserted:
+            on_insert(inserted)
+        return {'inserted': inserted, 'errors': errors}
+
+    def get_students_statistics(self):
+        stats = {'total': len(self.students), 'active': 0, 'graduated': 0}
+        by_status = {}
+        by_year = {}
+        for student in self.students:
+            graduado = int(student['graduado'])
+            stats['graduated' if graduado else 'active'] += 1
+            by_year[student['anio_inicio']] = by_year.get(student['anio_inicio'], 0) + 1
+            if student['promedio_actual'] is not None:
+                status = by_status.setdefault(graduado, [Decimal('0'), 0])
+                status[0] += StudentModel._to_decimal(student['promedio_actual'])
+                status[1] += 1
+        stats['avg_by_status'] = [{'graduado': g, 'avg_promedio': total / count}
+                                  for g, (total, count) in sorted(by_status.items())]
+        stats['by_year'] = [{'anio_inicio': anio, 'count': count}
+                            for anio, count in sorted(by_year.items(), reverse=True)]
+        return stats
+
+    def get_students_page(self, limit, after_id=None, filters=None, fields=None, as_tuples=False):
+        filters = filters or {}
+        # Los ids son 1..n, así que la posición de after_id es after_id - 1
+        end = len(self.students) if after_id is None else min(after_id - 1, len(self.students))
+        columns = StudentModel.page_columns(fields)
+        rows = []
+        for index in range(end - 1, -1, -1):
+            student = self.students[index]
+            if filters.get('graduado') is not None and int(student['graduado']) != filters['graduado']:
+                continue
+            if as_tuples:
+                rows.append(tuple(student[column] for column in columns))
+            else:
+                rows.append({column: student[column] for column in columns})
+            if len(rows) > limit:
+                break
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = rows[limit - 1][0 if as_tuples else 'id']
+        return rows[:limit], next_cursor
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def peak_rss_mb() -> float:
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def measure(name: str, run: Callable[[int], None], repeat: int, rows: Optional[int] = None,
+            **details) -> Dict:
+    """
+    Ejecuta run(iteración) repeat veces y resume latencias, rendimiento y RSS máximo.
+    El progreso va a stderr para que stdout sea solo el JSON del reporte.
+    peak_rss_mb es el máximo del proceso hasta ese momento (no decrece entre casos).
+    """
+    samples = []
+    for iteration in range(repeat):
+        start = time.perf_counter()
+        run(iteration)
+        samples.append(time.perf_counter() - start)
+
+    result = {
+        'name': name,
+        **details,
+        'repeat': repeat,
+        'p50_ms': round(percentile(samples, 0.5) * 1000, 3),
+        'p99_ms': round(percentile(samples, 0.99) * 1000, 3),
+        'mean_ms': round(sum(samples) / len(samples) * 1000, 3),
+        'peak_rss_mb': peak_rss_mb()
+    }
+    if rows:
+        result['rows'] = rows
+        result['rows_per_second'] = round(rows / percentile(samples, 0.5))
+    print(f"{name:<28} {str(details.get('format', '')):<5} rows={rows or '-':<8} "
+          f"p50={result['p50_ms']:.1f}ms p99={result['p99_ms']:.1f}ms rss={result['peak_rss_mb']}MB",
+          file=sys.stderr)
+    return result
+
+def benchmark_import(size: int, formats: List[str], args, directory: str) -> List[Dict]:
+    results = []
+    roster = generate_roster(size, args.error_rate, args.duplicate_ratio, seed=args.seed)
+
+    for file_format in formats:
+        path = write_roster(roster, file_format, directory)
+        # Lectura por separado: la diferencia con validate_excel_file es el costo de validar
+        columns = StudentController.REQUIRED_COLUMNS + StudentController.OPTIONAL_COLUMNS
+        results.append(measure(
+            'read_upload',
+            lambda iteration: read_upload(path, file_format, columns, StudentController.COLUMN_DTYPES),
+            args.repeat, rows=size, format=file_format, engine=select_reader(file_format).engine
+        ))
+        results.append(measure(
+            'validate_excel_file',
+            lambda iteration: StudentController.validate_excel_file(path),
+            args.repeat, rows=size, format=file_format, file_mb=round(os.path.getsize(path) / 1024 / 1024, 2)
+        ))
+
+    # Cada repetición inserta un lote nuevo para no chocar con las llaves únicas
+    batches = []
+    for iteration in range(args.repeat):
+        valid, _ = StudentController.validate_excel_file(
+            write_roster(generate_roster(size, seed=args.seed + 1 + iteration), 'csv', directory))
+        batches.append(valid)
+    results.append(measure(
+        'insert_students',
+        lambda iteration: StudentController.insert_students(batches[iteration]),
+        args.repeat, rows=size
+    ))
+    return results
+
+def benchmark_dashboard(args) -> List[Dict]:
+    from flask_jwt_extended import create_access_token
+    from app import app
+
+    client = app.test_client()
+    with app.app_context():
+        headers = {'Authorization': f'Bearer {create_access_token(identity="benchmark")}'}
+
+    def get(url):
+        def run(iteration):
+            # Sin caché: se mide la consulta y la serialización
+            response_cache.bump()
+            response = client.get(url, headers=headers)
+            assert response.status_code == 200, response.get_data(as_text=True)
+        return run
+
+    repeat = max(args.repeat, 20)
+    return [
+        measure('get_students_statistics', lambda iteration: StudentModel.get_students_statistics(), repeat),
+        measure('GET /api/dashboard/statistics', get('/api/dashboard/statistics'), repeat),
+        measure('GET /api/dashboard/students', get('/api/dashboard/students?limit=50'), repeat),
+        measure('GET /api/students', get('/api/students/?limit=500'), repeat),
+        measure('GET /api/students columns', get('/api/students/?limit=500&shape=columns'), repeat),
+        measure('GET /api/students graduado', get('/api/students/?limit=50&graduado=1'), repeat)
+    ]
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except Exception:
+        return None
+
+def main(argv=None) -> Dict:
+    parser = argparse.ArgumentParser(description='Benchmarks de importación y dashboard')
+    parser.add_argument('--sizes', default='10000', help='tamaños separados por coma')
+    parser.add_argument('--formats', default='csv,xlsx')
+    parser.add_argument('--error-rate', type=float, default=0.01)
+    parser.add_argument('--duplicate-ratio', type=float, default=0.01)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--backend', choices=['memory', 'mysql'], default='memory')
+    parser.add_argument('--output', help='archivo JSON de salida (por defecto stdout)')
+    args = parser.parse_args(argv)
+
+    if args.backend == 'memory':
+        MemoryStudentStore().install()
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for size in (int(s) for s in args.sizes.split(',')):
+            results.extend(benchmark_import(size, args.formats.split(','), args, directory))
+    results.extend(benchmark_dashboard(args))
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'orjson': orjson.__version__ if orjson is not None else None,
+        'backend': args.backend,
+        'parameters': {k: v for k, v in vars(args).items() if k != 'output'},
+        'results': results
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    return report
+
+if __name__ == '__main__':
+    main()
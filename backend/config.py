@@ -8,6 +8,57 @@ class Config:
     DB_USER = os.getenv('DB_USER', 'root')
     DB_PASSWORD = os.getenv('DB_PASSWORD', '')
     DB_NAME = os.getenv('DB_NAME', 'education_db')
+    DB_PORT = int(os.getenv('DB_PORT', 3306))
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'dev-secret-key-change-in-production')
     JWT_ACCESS_TOKEN_EXPIRES = int(os.getenv('JWT_ACCESS_TOKEN_EXPIRES', 86400))
-
+    INSERT_CHUNK_SIZE = int(os.getenv('INSERT_CHUNK_SIZE', 1000))
+    INSERT_MODE = os.getenv('INSERT_MODE', 'bulk')  # 'bulk' o 'row'
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+    DB_POOL_MAX_OVERFLOW = int(os.getenv('DB_POOL_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 3600))
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    UNIQUENESS_BATCH_SIZE = int(os.getenv('UNIQUENESS_BATCH_SIZE', 1000))
+    STREAM_THRESHOLD_MB = float(os.getenv('STREAM_THRESHOLD_MB', 20))
+    STREAM_CHUNK_ROWS = int(os.getenv('STREAM_CHUNK_ROWS', 10000))
+    STREAM_MEMORY_LIMIT_MB = float(os.getenv('STREAM_MEMORY_LIMIT_MB', 256))
+    IMPORT_WORKERS = int(os.getenv('IMPORT_WORKERS', 2))
+    IMPORT_JOBS_RETAINED = int(os.getenv('IMPORT_JOBS_RETAINED', 100))
+    PAGE_SIZE_DEFAULT = int(os.getenv('PAGE_SIZE_DEFAULT', 50))
+    PAGE_SIZE_MAX = int(os.getenv('PAGE_SIZE_MAX', 500))
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 5000))
+    CACHE_ENABLED = os.getenv('CACHE_ENABLED', 'true').lower() == 'true'
+    CACHE_TTL = float(os.getenv('CACHE_TTL', 30))
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 256))
+    BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 12))
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 16))
+    PASSWORD_HASH_TIMEOUT = float(os.getenv('PASSWORD_HASH_TIMEOUT', 10))
+    USER_CACHE_TTL = float(os.getenv('USER_CACHE_TTL', 300))
+    USER_CACHE_MAX_ENTRIES = int(os.getenv('USER_CACHE_MAX_ENTRIES', 1024))
+    UPLOAD_SPOOL_MAX_MB = float(os.getenv('UPLOAD_SPOOL_MAX_MB', 8))
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 0))
+    VALIDATION_WORKERS = int(os.getenv('VALIDATION_WORKERS', 0))  # 0 = núcleos disponibles
+    PARALLEL_VALIDATION_MIN_ROWS = int(os.getenv('PARALLEL_VALIDATION_MIN_ROWS', 200000))
+    ERROR_INLINE_LIMIT = int(os.getenv('ERROR_INLINE_LIMIT', 100))
+    VALIDATION_ERROR_BUDGET = int(os.getenv('VALIDATION_ERROR_BUDGET', 0))  # 0 = sin límite
+    ERROR_REPORTS_RETAINED = int(os.getenv('ERROR_REPORTS_RETAINED', 50))
+    SEARCH_LIMIT_DEFAULT = int(os.getenv('SEARCH_LIMIT_DEFAULT', 20))
+    SEARCH_LIMIT_MAX = int(os.getenv('SEARCH_LIMIT_MAX', 100))
+    SEARCH_NGRAM_TOKEN_SIZE = int(os.getenv('SEARCH_NGRAM_TOKEN_SIZE', 2))  # ngram_token_size del servidor
+    UPLOAD_READER_ENGINES = os.getenv('UPLOAD_READER_ENGINES', '')  # p. ej. csv=c,xlsx=openpyxl
+    BATCH_MAX_FILES = int(os.getenv('BATCH_MAX_FILES', 20))
+    BATCH_MAX_MB = float(os.getenv('BATCH_MAX_MB', 100))  # total descomprimido de un lote
+    BATCH_WORKERS = int(os.getenv('BATCH_WORKERS', 0))  # 0 = núcleos disponibles
+    UPLOAD_DEDUP_ENABLED = os.getenv('UPLOAD_DEDUP_ENABLED', 'true').lower() == 'true'
+    UPLOAD_DEDUP_MAX_ENTRIES = int(os.getenv('UPLOAD_DEDUP_MAX_ENTRIES', 256))
+    UPLOAD_DEDUP_TTL = float(os.getenv('UPLOAD_DEDUP_TTL', 3600))
+    DB_READ_HOST = os.getenv('DB_READ_HOST', '')  # réplica para lecturas; vacío = primario
+    DB_READ_PORT = int(os.getenv('DB_READ_PORT', 3306))
+    DB_READ_USER = os.getenv('DB_READ_USER', DB_USER)
+    DB_READ_PASSWORD = os.getenv('DB_READ_PASSWORD', DB_PASSWORD)
+    DB_READ_POOL_SIZE = int(os.getenv('DB_READ_POOL_SIZE', DB_POOL_SIZE))
+    DB_READ_POOL_MAX_OVERFLOW = int(os.getenv('DB_READ_POOL_MAX_OVERFLOW', DB_POOL_MAX_OVERFLOW))
+    READ_YOUR_WRITES_SECONDS = float(os.getenv('READ_YOUR_WRITES_SECONDS', 5))
+    JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'orjson')  # 'orjson' (si está instalado) o 'default'
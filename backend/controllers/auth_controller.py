@@ -1,4 +1,5 @@
 from models.user_model import UserModel
+from services.password_hasher import HasherBusyError
 from flask_jwt_extended import create_access_token
 
 class AuthController:
@@ -9,8 +10,18 @@ class AuthController:
         if not user:
             return {'error': 'Credenciales inválidas'}, 401
         
-        if not UserModel.verify_password(user['password'], password):
-            return {'error': 'Credenciales inválidas'}, 401
+        try:
+            if not UserModel.verify_password(user['password'], password):
+                return {'error': 'Credenciales inválidas'}, 401
+        except HasherBusyError:
+            return {'error': 'Servidor ocupado, intente de nuevo en unos segundos'}, 503
+        
+        # Actualizar el hash si fue generado con otro costo de bcrypt
+        if UserModel.needs_rehash(user['password']):
+            try:
+                UserModel.update_password(user['id'], password)
+            except Exception:
+                pass  # El inicio de sesión no depende del rehash
         
         access_token = create_access_token(identity=str(user['id']))
         
@@ -33,6 +44,8 @@ class AuthController:
         try:
             user_id = UserModel.create_user(email, password)
             return {'message': 'Usuario creado exitosamente', 'user_id': user_id}, 201
+        except HasherBusyError:
+            return {'error': 'Servidor ocupado, intente de nuevo en unos segundos'}, 503
         except Exception as e:
             if 'Duplicate entry' in str(e):
                 return {'error': 'El email ya está registrado'}, 400
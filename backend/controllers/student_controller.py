@@ -1,198 +1,1230 @@
 from models.student_model import StudentModel
-from typing import List, Dict
+from database.connection import db_read
+from config import Config
+from services.cache import response_cache
+from services.validation_pool import validation_pool
+from services.error_reports import error_reports, summarize_errors
+from services.file_readers import read_upload
+from services.json_provider import dumps_bytes
+from typing import BinaryIO, Callable, Iterator, List, Dict, Optional, Union
+import csv
+import io
+import math
+import os
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import openpyxl
 import pandas as pd
+import numpy as np
 from datetime import datetime
 
 class StudentController:
+    REQUIRED_COLUMNS = ['nombre_estudiante', 'anio_inicio', 'NUE']
+    OPTIONAL_COLUMNS = ['estado', 'promedio_actual', 'promedio_graduacion']
+    # Columnas de texto: se leen como texto (un nombre "007" no pasa a 7). Las
+    # numéricas se infieren para que los valores inválidos lleguen a la validación.
+    COLUMN_DTYPES = {'nombre_estudiante': str, 'estado': str}
+    # Textos que pd.read_excel interpreta como celda vacía (na_values por defecto)
+    EXCEL_NA_VALUES = {'', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+                       '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None',
+                       'n/a', 'nan', 'null'}
+
     @staticmethod
-    def validate_excel_file(file_path: str) -> tuple[List[Dict], List[Dict]]:
+    def validate_excel_file(source: Union[str, BinaryIO], vectorized: bool = True,
+                            progress=None, filename: Optional[str] = None,
+                            parallel: Optional[bool] = None,
+                            max_errors: Optional[int] = None,
+                            upsert: bool = False) -> tuple[List[Dict], List[Dict]]:
         """
         Validates Excel file and returns (valid_students, errors)
+
+        source puede ser una ruta o un archivo binario abierto; en ese caso el
+        formato se toma de filename.
+        vectorized=False usa la validación fila por fila original (referencia para paridad)
+        parallel reparte las verificaciones por fila entre procesos; con None se
+        usa solo desde Config.PARALLEL_VALIDATION_MIN_ROWS filas
+        max_errors detiene el armado de errores al alcanzar ese presupuesto
+        (por defecto Config.VALIDATION_ERROR_BUDGET; 0 = sin límite)
+        upsert=True acepta NUEs existentes (la fila se actualiza); un nombre
+        existente solo es error si pertenece a otro NUE
         """
+        if max_errors is None:
+            max_errors = Config.VALIDATION_ERROR_BUDGET
         errors = []
         valid_students = []
-        current_year = datetime.now().year
         
         try:
-            # Determinar el tipo de archivo y leer en consecuencia
-            if file_path.endswith('.csv'):
-                df = pd.read_csv(file_path)
-            else:
-                df = pd.read_excel(file_path)
+            # Leer solo las columnas conocidas con el motor más rápido disponible
+            started = time.perf_counter()
+            df, engine = read_upload(source, StudentController._file_format(source, filename),
+                                     StudentController.REQUIRED_COLUMNS + StudentController.OPTIONAL_COLUMNS,
+                                     StudentController.COLUMN_DTYPES)
+            if progress:
+                progress.reader = engine
+                progress.add(rows_parsed=len(df), parse_seconds=time.perf_counter() - started)
             
             # Verificar columnas requeridas
-            required_columns = ['nombre_estudiante', 'anio_inicio', 'NUE']
-            missing_columns = [col for col in required_columns if col not in df.columns]
-            if missing_columns:
+            missing = StudentController._missing_columns_error(df)
+            if missing:
+                errors.append(missing)
+                return valid_students, errors
+            
+            # Las verificaciones de unicidad solo consultan los nombres y NUEs del archivo
+            started = time.perf_counter()
+            find_existing = StudentModel.find_existing_keys
+            if upsert:
+                find_existing = lambda nombres, nues: (set(), set())
+            if vectorized:
+                checks = None
+                if parallel or (parallel is None and validation_pool.should_use(len(df))):
+                    checks = StudentController._parallel_row_checks(df)
+                StudentController._validate_columns(df, find_existing,
+                                                    valid_students, errors, checks, max_errors)
+            else:
+                nombres, nues = StudentController._candidate_keys(df)
+                existing_nombres, existing_nues = find_existing(nombres, nues)
+                StudentController._validate_rows(df, existing_nombres, existing_nues,
+                                                 valid_students, errors)
+            if upsert:
+                StudentController._check_upsert_nombres(df, valid_students, errors)
+                if max_errors:
+                    del errors[max_errors:]
+            if progress:
+                progress.add(rows_validated=len(df), error_count=len(errors),
+                             validate_seconds=time.perf_counter() - started)
+            
+            return valid_students, errors
+            
+        except Exception as e:
+            errors.append(StudentController._file_error(e))
+            return valid_students, errors
+
+    @staticmethod
+    def _file_error(error: Exception) -> Dict:
+        return {
+            'row': 0,
+            'field': 'file',
+            'value': '',
+            'message': f'Error al leer el archivo: {str(error)}'
+        }
+
+    @staticmethod
+    def _missing_columns_error(df: pd.DataFrame) -> Optional[Dict]:
+        missing_columns = [col for col in StudentController.REQUIRED_COLUMNS if col not in df.columns]
+        if not missing_columns:
+            return None
+        return {
+            'row': 0,
+            'field': 'columns',
+            'value': ', '.join(missing_columns),
+            'message': f'Columnas faltantes: {", ".join(missing_columns)}'
+        }
+
+    @staticmethod
+    def _check_upsert_nombres(df: pd.DataFrame, valid_students: List[Dict], errors: List[Dict]) -> None:
+        """
+        En modo upsert un nombre ya guardado con otro NUE sigue siendo un
+        duplicado: esas filas pasan de válidas a error, con el mismo mensaje
+        que la validación normal y en orden de fila
+        """
+        stored = StudentModel.find_nues_by_nombre([s['nombre_estudiante'] for s in valid_students])
+        if not stored:
+            return
+        # Fila de cada estudiante válido: la única fila sin errores con ese NUE
+        error_rows = {error['row'] for error in errors}
+        row_by_nue = {}
+        for index, nue in zip(df.index, df['NUE'].tolist()):
+            if index + 2 in error_rows:
+                continue
+            try:
+                row_by_nue.setdefault(int(float(nue)), index + 2)
+            except (ValueError, TypeError, OverflowError):
+                pass
+        
+        kept = []
+        for student in valid_students:
+            nombre = student['nombre_estudiante']
+            if nombre in stored and stored[nombre] != student['nue']:
                 errors.append({
-                    'row': 0,
-                    'field': 'columns',
-                    'value': ', '.join(missing_columns),
-                    'message': f'Columnas faltantes: {", ".join(missing_columns)}'
+                    'row': row_by_nue[student['nue']],
+                    'field': 'nombre_estudiante',
+                    'value': nombre,
+                    'message': f'nombre_estudiante "{nombre}" ya existe en la base de datos'
                 })
-                return valid_students, errors
+            else:
+                kept.append(student)
+        valid_students[:] = kept
+        errors.sort(key=lambda error: error['row'])
+
+    @staticmethod
+    def process_upload(source: Union[str, BinaryIO], stream: bool = False, progress=None,
+                       filename: Optional[str] = None, owner: Optional[str] = None,
+                       upsert: bool = False) -> tuple[Dict, int]:
+        """
+        Valida e inserta un archivo subido y devuelve (respuesta, código de estado).
+        owner es el dueño de los reportes de errores que se generen.
+        upsert=True actualiza por NUE los estudiantes existentes que cambiaron
+        (se procesa siempre con el archivo completo, sin streaming).
+        """
+        if upsert:
+            return StudentController._upsert_upload(source, progress, filename, owner)
+        
+        if stream:
+            return StudentController._streaming_response(
+                StudentController.import_file_streaming(source, progress=progress, filename=filename),
+                owner)
+        
+        valid_students, errors = StudentController.validate_excel_file(source, progress=progress,
+                                                                       filename=filename)
+        
+        rejected = StudentController._rejected_upload(valid_students, errors, owner)
+        if rejected:
+            return rejected
+        
+        result = StudentController.insert_students(valid_students, progress=progress)
+        
+        if result['errors']:
+            return StudentController._with_error_report({
+                'success': True,
+                'inserted': result['inserted'],
+                'message': f'Se insertaron {result["inserted"]} estudiantes con algunos errores'
+            }, result['errors'], owner), 200
+        
+        return {
+            'success': True,
+            'inserted': result['inserted'],
+            'message': f'Se insertaron {result["inserted"]} estudiantes exitosamente'
+        }, 200
+
+    @staticmethod
+    def _rejected_upload(valid_students: List[Dict], errors: List[Dict],
+                         owner: Optional[str] = None) -> Optional[tuple[Dict, int]]:
+        """
+        Respuesta 400 de un archivo con errores de validación o sin estudiantes
+        válidos; None si se puede insertar
+        """
+        if errors:
+            budget = Config.VALIDATION_ERROR_BUDGET
+            return StudentController._with_error_report({
+                'valid': False,
+                'valid_count': len(valid_students)
+            }, errors, owner, budget_exhausted=bool(budget) and len(errors) >= budget), 400
+        
+        if not valid_students:
+            return {
+                'valid': False,
+                'errors': [{'row': 0, 'field': 'file', 'value': '', 'message': 'No hay estudiantes válidos en el archivo'}],
+                'valid_count': 0
+            }, 400
+        
+        return None
+
+    @staticmethod
+    def _upsert_upload(source: Union[str, BinaryIO], progress=None, filename: Optional[str] = None,
+                       owner: Optional[str] = None) -> tuple[Dict, int]:
+        valid_students, errors = StudentController.validate_excel_file(source, progress=progress,
+                                                                       filename=filename, upsert=True)
+        
+        rejected = StudentController._rejected_upload(valid_students, errors, owner)
+        if rejected:
+            return rejected
+        
+        result = StudentController.upsert_students(valid_students, progress=progress)
+        response = {
+            'success': True,
+            'inserted': result['inserted'],
+            'updated': result['updated'],
+            'unchanged': result['unchanged'],
+            'message': (f'Se insertaron {result["inserted"]}, se actualizaron {result["updated"]} '
+                        f'y {result["unchanged"]} estudiantes no tenían cambios')
+        }
+        if result['errors']:
+            StudentController._with_error_report(response, result['errors'], owner)
+            response['message'] += ' (con algunos errores)'
+        return response, 200
+
+    @staticmethod
+    def process_batch_upload(files: List[tuple], progress=None,
+                             owner: Optional[str] = None) -> tuple[Dict, int]:
+        """
+        Valida e inserta varios archivos como un solo lote; files es una lista
+        de (archivo binario, nombre). La lectura y las verificaciones por fila
+        corren en paralelo; la unicidad se resuelve después en el orden de los
+        archivos, así que un nombre o NUE de un archivo anterior cuenta como
+        existente. Si algún archivo tiene errores no se inserta nada; si no,
+        todas las filas se insertan en una sola transacción.
+        Devuelve (respuesta con el resultado por archivo, código de estado).
+        """
+        budget = Config.VALIDATION_ERROR_BUDGET or None
+        workers = max(1, min(len(files), Config.BATCH_WORKERS or os.cpu_count() or 1))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='batch') as executor:
+            futures = [executor.submit(StudentController._parse_batch_file, source, filename, progress)
+                       for source, filename in files]
+            parsed = [future.result() for future in futures]
+        
+        seen_nombres = set()
+        seen_nues = set()
+        find_existing = StudentController._find_existing_except(seen_nombres, seen_nues)
+        valid_students = []
+        results = []
+        file_errors = []
+        for (_, filename), (df, checks, error) in zip(files, parsed):
+            valid = []
+            errors = [error] if error else []
+            if df is not None and not error:
+                started = time.perf_counter()
+                try:
+                    StudentController._validate_columns(df, find_existing, valid, errors, checks, budget)
+                except Exception as e:
+                    valid = []
+                    errors = [StudentController._file_error(e)]
+                if progress:
+                    progress.add(rows_validated=len(df), error_count=len(errors),
+                                 validate_seconds=time.perf_counter() - started)
             
-            # Obtener estudiantes existentes para verificaciones de unicidad
-            existing_students = StudentModel.get_all_students()
-            existing_nombres = {s['nombre_estudiante'] for s in existing_students}
-            existing_nues = {s['nue'] for s in existing_students}
+            for student in valid:
+                seen_nombres.add(student['nombre_estudiante'])
+                seen_nues.add(student['nue'])
+            valid_students.extend(valid)
+            results.append({
+                'filename': filename,
+                'rows': 0 if df is None else len(df),
+                'valid_count': len(valid)
+            })
+            file_errors.append(errors)
+        
+        failed = [result for result, errors in zip(results, file_errors) if errors]
+        if failed:
+            for result, errors in zip(results, file_errors):
+                if errors:
+                    StudentController._with_error_report(
+                        result, errors, owner, budget_exhausted=bool(budget) and len(errors) >= budget)
+            return {
+                'valid': False,
+                'valid_count': len(valid_students),
+                'error_count': sum(len(errors) for errors in file_errors),
+                'files': results,
+                'message': f'{len(failed)} de {len(results)} archivos tienen errores; no se insertó ningún estudiante'
+            }, 400
+        
+        if not valid_students:
+            return {
+                'valid': False,
+                'errors': [{'row': 0, 'field': 'file', 'value': '', 'message': 'No hay estudiantes válidos en los archivos'}],
+                'valid_count': 0,
+                'files': results
+            }, 400
+        
+        result = StudentController.insert_students(valid_students, progress=progress, atomic=True)
+        
+        if result['errors']:
+            return StudentController._with_error_report({
+                'valid': False,
+                'inserted': 0,
+                'files': results,
+                'message': 'No se insertó ningún estudiante: el lote falló al guardarse'
+            }, result['errors'], owner), 400
+        
+        for item in results:
+            item['inserted'] = item['valid_count']
+        return {
+            'success': True,
+            'inserted': result['inserted'],
+            'files': results,
+            'message': f'Se insertaron {result["inserted"]} estudiantes de {len(results)} archivos exitosamente'
+        }, 200
+
+    @staticmethod
+    def _parse_batch_file(source: BinaryIO, filename: str, progress=None) -> tuple:
+        """
+        Lee un archivo del lote y calcula sus verificaciones por fila.
+        Devuelve (DataFrame, checks, error de archivo o None).
+        """
+        started = time.perf_counter()
+        try:
+            df, engine = read_upload(source, StudentController._file_format(source, filename),
+                                     StudentController.REQUIRED_COLUMNS + StudentController.OPTIONAL_COLUMNS,
+                                     StudentController.COLUMN_DTYPES)
+            if progress:
+                progress.reader = engine
+                progress.add(rows_parsed=len(df), parse_seconds=time.perf_counter() - started)
             
-            for index, row in df.iterrows():
-                row_num = index + 2  # +2 porque excel empieza en 1 y tenemos encabezado
-                row_errors = []
+            missing = StudentController._missing_columns_error(df)
+            if missing:
+                return df, None, missing
+            
+            started = time.perf_counter()
+            df = StudentController._upcast_like_iterrows(df)
+            checks = StudentController._row_checks(df) if not df.empty else None
+            if progress:
+                progress.add(validate_seconds=time.perf_counter() - started)
+            return df, checks, None
+        except Exception as e:
+            return None, None, StudentController._file_error(e)
+
+    @staticmethod
+    def _find_existing_except(seen_nombres: set, seen_nues: set) -> Callable[[list, list], tuple[set, set]]:
+        """
+        find_existing que además cuenta como existentes los nombres y NUEs de
+        seen_* (filas válidas de bloques o archivos anteriores); solo consulta
+        la base de datos por los que no están en esos conjuntos
+        """
+        def find_existing(nombres, nues):
+            existing_nombres, existing_nues = StudentModel.find_existing_keys(
+                [n for n in nombres if n not in seen_nombres],
+                [n for n in nues if n not in seen_nues]
+            )
+            existing_nombres.update(seen_nombres.intersection(nombres))
+            existing_nues.update(seen_nues.intersection(nues))
+            return existing_nombres, existing_nues
+        return find_existing
+
+    @staticmethod
+    def _with_error_report(response: Dict, errors: List[Dict], owner: Optional[str] = None,
+                           budget_exhausted: bool = False) -> Dict:
+        """
+        Agrega a la respuesta los primeros Config.ERROR_INLINE_LIMIT errores, el
+        total y el conteo por campo y tipo. Si hay más errores, la lista completa
+        se guarda como reporte CSV descargable por report_id.
+        """
+        limit = Config.ERROR_INLINE_LIMIT
+        response['errors'] = errors[:limit]
+        response['error_count'] = len(errors)
+        response['error_summary'] = summarize_errors(errors)
+        if len(errors) > limit:
+            response['errors_truncated'] = True
+            response['report_id'] = error_reports.save(errors, owner)
+        if budget_exhausted:
+            response['error_budget_exhausted'] = True
+        return response
+
+    @staticmethod
+    def _streaming_response(result: Dict, owner: Optional[str] = None) -> tuple[Dict, int]:
+        if result['inserted'] == 0:
+            errors = result['errors'] or [{'row': 0, 'field': 'file', 'value': '', 'message': 'No hay estudiantes válidos en el archivo'}]
+            response = StudentController._with_error_report({
+                'valid': False,
+                'insert_errors': result['insert_errors'][:Config.ERROR_INLINE_LIMIT],
+                'valid_count': 0
+            }, errors + result['insert_errors'], owner, result.get('stopped_early', False))
+            # Los errores de inserción van aparte en la respuesta
+            response['errors'] = errors[:Config.ERROR_INLINE_LIMIT]
+            return response, 400
+        
+        response = {
+            'success': True,
+            'rows': result['rows'],
+            'inserted': result['inserted'],
+            'message': f'Se insertaron {result["inserted"]} de {result["rows"]} estudiantes'
+        }
+        if result['errors'] or result['insert_errors']:
+            StudentController._with_error_report(response, result['errors'] + result['insert_errors'],
+                                                 owner, result.get('stopped_early', False))
+            response['message'] += ' con algunos errores'
+        if result.get('stopped_early'):
+            response['message'] += '; la importación se detuvo al alcanzar el límite de errores'
+        return response, 200
+
+    @staticmethod
+    def import_file_streaming(source: Union[str, BinaryIO], chunk_rows: Optional[int] = None,
+                              memory_limit_mb: Optional[float] = None, progress=None,
+                              filename: Optional[str] = None) -> Dict:
+        """
+        Valida e inserta el archivo por bloques sin cargarlo completo en memoria.
+        Cada bloque válido se inserta en cuanto se valida, por lo que los errores
+        de bloques posteriores no revierten lo ya insertado. Con
+        Config.VALIDATION_ERROR_BUDGET la lectura se detiene al agotarse el presupuesto.
+        """
+        budget = Config.VALIDATION_ERROR_BUDGET or None
+        stopped_early = False
+        chunk_rows = chunk_rows or Config.STREAM_CHUNK_ROWS
+        memory_limit = int((memory_limit_mb or Config.STREAM_MEMORY_LIMIT_MB) * 1024 * 1024)
+        errors = []
+        insert_errors = []
+        inserted = 0
+        rows = 0
+        # Llaves de filas válidas de bloques anteriores (duplicados entre bloques)
+        seen_nombres = set()
+        seen_nues = set()
+        find_existing = StudentController._find_existing_except(seen_nombres, seen_nues)
+        
+        try:
+            chunks = StudentController._iter_file_chunks(source, filename, chunk_rows, memory_limit)
+            while True:
+                # El tiempo de lectura incluye el parseo de cada bloque
+                started = time.perf_counter()
+                df = next(chunks, None)
+                if df is None:
+                    break
+                if progress:
+                    progress.add(parse_seconds=time.perf_counter() - started)
+                if rows == 0:
+                    missing = StudentController._missing_columns_error(df)
+                    if missing:
+                        errors.append(missing)
+                        break
+                rows += len(df)
+                if progress:
+                    progress.add(rows_parsed=len(df))
                 
-                # Validando nombre_estudiante (único, string)
-                nombre = str(row.get('nombre_estudiante', '')).strip()
-                if not nombre or nombre == 'nan':
-                    row_errors.append({
-                        'row': row_num,
-                        'field': 'nombre_estudiante',
-                        'value': nombre,
-                        'message': 'nombre_estudiante es requerido'
-                    })
-                elif nombre in existing_nombres:
-                    row_errors.append({
-                        'row': row_num,
-                        'field': 'nombre_estudiante',
-                        'value': nombre,
-                        'message': f'nombre_estudiante "{nombre}" ya existe en la base de datos'
-                    })
+                chunk_valid = []
+                error_count = len(errors)
+                started = time.perf_counter()
+                StudentController._validate_columns(df, find_existing, chunk_valid, errors,
+                                                    max_errors=budget)
+                if progress:
+                    progress.add(rows_validated=len(df), error_count=len(errors) - error_count,
+                                 validate_seconds=time.perf_counter() - started)
+                del df
                 
-                # Validando anio_inicio (requerido, no mayor al año actual)
-                anio_inicio = row.get('anio_inicio')
-                if pd.isna(anio_inicio):
-                    row_errors.append({
-                        'row': row_num,
-                        'field': 'anio_inicio',
-                        'value': anio_inicio,
-                        'message': 'anio_inicio es requerido'
-                    })
-                else:
+                for student in chunk_valid:
+                    seen_nombres.add(student['nombre_estudiante'])
+                    seen_nues.add(student['nue'])
+                
+                if chunk_valid:
+                    result = StudentController.insert_students(chunk_valid, progress=progress)
+                    inserted += result['inserted']
+                    insert_errors.extend(result['errors'])
+                
+                if budget and len(errors) >= budget:
+                    stopped_early = True
+                    break
+        except Exception as e:
+            errors.append(StudentController._file_error(e))
+        
+        return {
+            'rows': rows,
+            'inserted': inserted,
+            'errors': errors,
+            'insert_errors': insert_errors,
+            'stopped_early': stopped_early
+        }
+
+    @staticmethod
+    def _iter_file_chunks(source: Union[str, BinaryIO], filename: Optional[str], chunk_rows: int,
+                          memory_limit: int) -> Iterator[pd.DataFrame]:
+        """
+        Lee el archivo por bloques: CSV con el iterador de pandas y XLSX con
+        openpyxl en modo solo lectura. El índice continúa entre bloques para
+        que el número de fila reportado sea el mismo que en la lectura completa.
+        """
+        max_rows = chunk_rows
+        file_format = StudentController._file_format(source, filename)
+        columns = StudentController.REQUIRED_COLUMNS + StudentController.OPTIONAL_COLUMNS
+        if file_format == 'csv':
+            with pd.read_csv(source, iterator=True, usecols=lambda name: name in columns,
+                             dtype=StudentController.COLUMN_DTYPES,
+                             float_precision='round_trip') as reader:
+                while True:
                     try:
-                        anio_inicio = int(float(anio_inicio))
-                        if anio_inicio > current_year:
-                            row_errors.append({
-                                'row': row_num,
-                                'field': 'anio_inicio',
-                                'value': anio_inicio,
-                                'message': f'anio_inicio ({anio_inicio}) no puede ser mayor al año actual ({current_year})'
-                            })
-                    except (ValueError, TypeError):
+                        df = reader.get_chunk(chunk_rows)
+                    except StopIteration:
+                        return
+                    chunk_rows = StudentController._fit_chunk_rows(df, max_rows, memory_limit)
+                    yield df
+        elif file_format == 'xlsx':
+            workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+            try:
+                sheet_rows = workbook.worksheets[0].iter_rows(values_only=True)
+                header = next(sheet_rows, None)
+                if header is None:
+                    return
+                names = [f'Unnamed: {i}' if name is None else name for i, name in enumerate(header)]
+                keep = [i for i, name in enumerate(names) if name in columns]
+                names = [names[i] for i in keep]
+                offset = 0
+                buffer = []
+                for values in sheet_rows:
+                    # pandas omite las filas completamente vacías
+                    if all(value is None for value in values):
+                        continue
+                    buffer.append([StudentController._excel_value(values[i]) if i < len(values) else np.nan
+                                   for i in keep])
+                    if len(buffer) >= chunk_rows:
+                        df = StudentController._excel_chunk(buffer, names, offset)
+                        offset += len(buffer)
+                        buffer = []
+                        chunk_rows = StudentController._fit_chunk_rows(df, max_rows, memory_limit)
+                        yield df
+                if buffer:
+                    yield StudentController._excel_chunk(buffer, names, offset)
+            finally:
+                workbook.close()
+        else:
+            # .xls no tiene lector por filas; se lee completo y se valida por bloques
+            df, _ = read_upload(source, file_format, columns, StudentController.COLUMN_DTYPES)
+            for start in range(0, len(df), chunk_rows):
+                yield df.iloc[start:start + chunk_rows]
+
+    @staticmethod
+    def _excel_value(value):
+        # Igual que pd.read_excel: celdas vacías como NaN y números enteros como int
+        if value is None or (isinstance(value, str) and value in StudentController.EXCEL_NA_VALUES):
+            return np.nan
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        return value
+
+    @staticmethod
+    def _excel_chunk(rows: List[list], columns: List[str], offset: int) -> pd.DataFrame:
+        df = pd.DataFrame(rows, columns=columns, index=range(offset, offset + len(rows)))
+        for name, dtype in StudentController.COLUMN_DTYPES.items():
+            if name in df.columns:
+                df[name] = df[name].astype(dtype).where(df[name].notna(), np.nan)
+        return df
+
+    @staticmethod
+    def _file_format(source: Union[str, BinaryIO], filename: Optional[str] = None) -> str:
+        """
+        Extensión en minúsculas tomada de filename o de la ruta
+        """
+        name = filename or (source if isinstance(source, str) else getattr(source, 'name', ''))
+        return str(name).rsplit('.', 1)[-1].lower()
+
+    @staticmethod
+    def _fit_chunk_rows(df: pd.DataFrame, max_rows: int, memory_limit: int) -> int:
+        """
+        Ajusta el tamaño del siguiente bloque para respetar el límite de memoria.
+        Se reserva una cuarta parte del límite para el bloque; el resto cubre las
+        máscaras y listas intermedias de la validación.
+        """
+        used = int(df.memory_usage(deep=True).sum())
+        if used > memory_limit:
+            raise MemoryError(
+                f'Un bloque de {len(df)} filas usa {used // (1024 * 1024)} MB y supera el límite de memoria')
+        per_row = max(used // max(len(df), 1), 1)
+        return max(1, min(max_rows, (memory_limit // 4) // per_row))
+
+    @staticmethod
+    def _validate_rows(df: pd.DataFrame, existing_nombres: set, existing_nues: set,
+                       valid_students: List[Dict], errors: List[Dict]) -> None:
+        """
+        Validación fila por fila con iterrows (implementación original)
+        """
+        current_year = datetime.now().year
+        
+        for index, row in df.iterrows():
+            row_num = index + 2  # +2 porque excel empieza en 1 y tenemos encabezado
+            row_errors = []
+            
+            # Validando nombre_estudiante (único, string)
+            nombre = str(row.get('nombre_estudiante', '')).strip()
+            if not nombre or nombre == 'nan':
+                row_errors.append({
+                    'row': row_num,
+                    'field': 'nombre_estudiante',
+                    'value': nombre,
+                    'message': 'nombre_estudiante es requerido'
+                })
+            elif nombre in existing_nombres:
+                row_errors.append({
+                    'row': row_num,
+                    'field': 'nombre_estudiante',
+                    'value': nombre,
+                    'message': f'nombre_estudiante "{nombre}" ya existe en la base de datos'
+                })
+            
+            # Validando anio_inicio (requerido, no mayor al año actual)
+            anio_inicio = row.get('anio_inicio')
+            if pd.isna(anio_inicio):
+                row_errors.append({
+                    'row': row_num,
+                    'field': 'anio_inicio',
+                    'value': anio_inicio,
+                    'message': 'anio_inicio es requerido'
+                })
+            else:
+                try:
+                    anio_inicio = int(float(anio_inicio))
+                    if anio_inicio > current_year:
                         row_errors.append({
                             'row': row_num,
                             'field': 'anio_inicio',
                             'value': anio_inicio,
-                            'message': 'anio_inicio debe ser un número válido'
+                            'message': f'anio_inicio ({anio_inicio}) no puede ser mayor al año actual ({current_year})'
                         })
-                
-                # Validando NUE (único, numérico)
-                nue = row.get('NUE')
-                if pd.isna(nue):
+                except (ValueError, TypeError):
                     row_errors.append({
                         'row': row_num,
-                        'field': 'NUE',
-                        'value': nue,
-                        'message': 'NUE es requerido'
+                        'field': 'anio_inicio',
+                        'value': anio_inicio,
+                        'message': 'anio_inicio debe ser un número válido'
                     })
-                else:
-                    try:
-                        nue = int(float(nue))
-                        if nue in existing_nues:
-                            row_errors.append({
-                                'row': row_num,
-                                'field': 'NUE',
-                                'value': nue,
-                                'message': f'NUE {nue} ya existe en la base de datos'
-                            })
-                    except (ValueError, TypeError):
+            
+            # Validando NUE (único, numérico)
+            nue = row.get('NUE')
+            if pd.isna(nue):
+                row_errors.append({
+                    'row': row_num,
+                    'field': 'NUE',
+                    'value': nue,
+                    'message': 'NUE es requerido'
+                })
+            else:
+                try:
+                    nue = int(float(nue))
+                    if nue in existing_nues:
                         row_errors.append({
                             'row': row_num,
                             'field': 'NUE',
                             'value': nue,
-                            'message': 'NUE debe ser un número válido'
+                            'message': f'NUE {nue} ya existe en la base de datos'
                         })
-                
-                # Obteniendo estado para determinar si está graduado
-                estado = str(row.get('estado', '')).strip().lower()
-                graduado = estado == 'graduado'
-                
-                # Promedios - permitir valores decimales y valores vacíos
-                promedio_actual = row.get('promedio_actual')
-                promedio_graduacion = row.get('promedio_graduacion')
-                
-                try:
-                    if pd.isna(promedio_actual) or promedio_actual == '' or str(promedio_actual).strip() == '':
-                        promedio_actual = None
-                    else:
-                        promedio_actual = float(promedio_actual)
                 except (ValueError, TypeError):
                     row_errors.append({
                         'row': row_num,
-                        'field': 'promedio_actual',
-                        'value': promedio_actual,
-                        'message': 'promedio_actual debe ser un número válido (puede ser decimal)'
+                        'field': 'NUE',
+                        'value': nue,
+                        'message': 'NUE debe ser un número válido'
                     })
+            
+            # Obteniendo estado para determinar si está graduado
+            estado = str(row.get('estado', '')).strip().lower()
+            graduado = estado == 'graduado'
+            
+            # Promedios - permitir valores decimales y valores vacíos
+            promedio_actual = row.get('promedio_actual')
+            promedio_graduacion = row.get('promedio_graduacion')
+            
+            try:
+                if pd.isna(promedio_actual) or promedio_actual == '' or str(promedio_actual).strip() == '':
                     promedio_actual = None
-                
-                # promedio_graduacion puede ir vacío siempre
-                try:
-                    if pd.isna(promedio_graduacion) or promedio_graduacion == '' or str(promedio_graduacion).strip() == '':
-                        promedio_graduacion = None
-                    else:
-                        promedio_graduacion = float(promedio_graduacion)
-                except (ValueError, TypeError):
-                    row_errors.append({
-                        'row': row_num,
-                        'field': 'promedio_graduacion',
-                        'value': promedio_graduacion,
-                        'message': 'promedio_graduacion debe ser un número válido (puede ser decimal) o estar vacío'
-                    })
+                else:
+                    promedio_actual = float(promedio_actual)
+            except (ValueError, TypeError):
+                row_errors.append({
+                    'row': row_num,
+                    'field': 'promedio_actual',
+                    'value': promedio_actual,
+                    'message': 'promedio_actual debe ser un número válido (puede ser decimal)'
+                })
+                promedio_actual = None
+            
+            # promedio_graduacion puede ir vacío siempre
+            try:
+                if pd.isna(promedio_graduacion) or promedio_graduacion == '' or str(promedio_graduacion).strip() == '':
                     promedio_graduacion = None
-                
-                # Si está graduado y ambos promedios están presentes, deben ser iguales
-                if graduado and promedio_actual is not None and promedio_graduacion is not None:
-                    if abs(promedio_actual - promedio_graduacion) > 0.01:  # Permitir pequeñas diferencias de punto flotante
-                        row_errors.append({
-                            'row': row_num,
-                            'field': 'promedio',
-                            'value': f'actual: {promedio_actual}, graduacion: {promedio_graduacion}',
-                            'message': f'Para estudiantes graduados, si ambos promedios están presentes, promedio_actual ({promedio_actual}) y promedio_graduacion ({promedio_graduacion}) deben ser iguales'
-                        })
-                
-                # anio_fin puede ir vacío 
-                
-                if row_errors:
-                    errors.extend(row_errors)
                 else:
-                    # Agregar a estudiantes válidos
-                    valid_students.append({
-                        'nombre_estudiante': nombre,
-                        'nue': int(float(nue)),
-                        'anio_inicio': int(float(anio_inicio)),
-                        'promedio_actual': promedio_actual,
-                        'promedio_graduacion': promedio_graduacion,
-                        'graduado': graduado
+                    promedio_graduacion = float(promedio_graduacion)
+            except (ValueError, TypeError):
+                row_errors.append({
+                    'row': row_num,
+                    'field': 'promedio_graduacion',
+                    'value': promedio_graduacion,
+                    'message': 'promedio_graduacion debe ser un número válido (puede ser decimal) o estar vacío'
+                })
+                promedio_graduacion = None
+            
+            # Si está graduado y ambos promedios están presentes, deben ser iguales
+            if graduado and promedio_actual is not None and promedio_graduacion is not None:
+                if abs(promedio_actual - promedio_graduacion) > 0.01:  # Permitir pequeñas diferencias de punto flotante
+                    row_errors.append({
+                        'row': row_num,
+                        'field': 'promedio',
+                        'value': f'actual: {promedio_actual}, graduacion: {promedio_graduacion}',
+                        'message': f'Para estudiantes graduados, si ambos promedios están presentes, promedio_actual ({promedio_actual}) y promedio_graduacion ({promedio_graduacion}) deben ser iguales'
                     })
-                    # Agregar a conjuntos existentes para verificar duplicados dentro del archivo
-                    existing_nombres.add(nombre)
-                    existing_nues.add(int(float(nue)))
             
-            return valid_students, errors
+            # anio_fin puede ir vacío 
             
-        except Exception as e:
+            if row_errors:
+                errors.extend(row_errors)
+            else:
+                # Agregar a estudiantes válidos
+                valid_students.append({
+                    'nombre_estudiante': nombre,
+                    'nue': int(float(nue)),
+                    'anio_inicio': int(float(anio_inicio)),
+                    'promedio_actual': promedio_actual,
+                    'promedio_graduacion': promedio_graduacion,
+                    'graduado': graduado
+                })
+                # Agregar a conjuntos existentes para verificar duplicados dentro del archivo
+                existing_nombres.add(nombre)
+                existing_nues.add(int(float(nue)))
+        
+
+    @staticmethod
+    def _validate_columns(df: pd.DataFrame, find_existing: Callable[[list, list], tuple[set, set]],
+                          valid_students: List[Dict], errors: List[Dict],
+                          checks: Optional[Dict[str, np.ndarray]] = None,
+                          max_errors: Optional[int] = None) -> None:
+        """
+        Validación por columnas con máscaras de pandas/NumPy.
+        Produce exactamente las mismas listas que _validate_rows.
+
+        find_existing(nombres, nues) devuelve los nombres y NUEs que ya existen en la base de datos
+        checks permite pasar el resultado de _row_checks ya calculado (p. ej. por varios procesos)
+        max_errors limita el total de errores en la lista (los primeros en orden)
+        """
+        current_year = datetime.now().year
+        if df.empty:
+            return
+        df = StudentController._upcast_like_iterrows(df)
+        if checks is None:
+            checks = StudentController._row_checks(df)
+        n = len(df)
+        positions = np.arange(n)
+        row_nums = (df.index + 2).tolist()
+        
+        nombres = pd.Series(checks['nombres'], dtype=object)
+        nombres_list = nombres.tolist()
+        nombre_present = checks['nombre_present']
+        
+        anio_raw = df['anio_inicio'].tolist()
+        anio_null, anio_bad, anio_float = checks['anio_null'], checks['anio_bad'], checks['anio_float']
+        nue_raw = df['NUE'].tolist()
+        nue_null, nue_bad, nue_float = checks['nue_null'], checks['nue_bad'], checks['nue_float']
+        
+        # int(float('inf')) lanza OverflowError en la validación original: se validan las
+        # filas anteriores y el error se propaga como error de archivo
+        overflow = ~anio_null & ~anio_bad & np.isinf(anio_float)
+        overflow |= ~nue_null & ~nue_bad & np.isinf(nue_float)
+        if overflow.any():
+            first = int(np.flatnonzero(overflow)[0])
+            StudentController._validate_columns(df.iloc[:first], find_existing,
+                                                valid_students, errors,
+                                                {name: values[:first] for name, values in checks.items()},
+                                                max_errors)
+            raise OverflowError('cannot convert float infinity to integer')
+        
+        anio_ok = ~anio_null & ~anio_bad
+        anio_int = np.trunc(anio_float)
+        anio_future = anio_ok & (anio_int > current_year)
+        nue_ok = ~nue_null & ~nue_bad
+        nue_key = np.trunc(nue_float)
+        
+        # estado y promedios
+        graduado = checks['graduado']
+        actual_raw = df['promedio_actual'].tolist() if 'promedio_actual' in df.columns else [None] * n
+        actual_present, actual_bad, actual = \
+            checks['actual_present'], checks['actual_bad'], checks['actual']
+        graduacion_raw = (df['promedio_graduacion'].tolist() if 'promedio_graduacion' in df.columns
+                          else [None] * n)
+        graduacion_present, graduacion_bad, graduacion = \
+            checks['graduacion_present'], checks['graduacion_bad'], checks['graduacion']
+        promedio_mismatch = graduado & actual_present & graduacion_present
+        with np.errstate(invalid='ignore'):
+            promedio_mismatch &= np.abs(actual - graduacion) > 0.01
+        
+        # Unicidad contra la base de datos
+        nue_in_range = nue_ok & (np.abs(np.where(nue_ok, nue_key, 0)) < 2 ** 63)
+        nue_ints = pd.Series(np.where(nue_in_range, nue_key, 0).astype(np.int64))
+        existing_nombres, existing_nues = find_existing(
+            nombres[nombre_present].unique().tolist(),
+            nue_ints[nue_in_range].unique().tolist()
+        )
+        nombre_in_db = nombre_present & nombres.isin(existing_nombres).to_numpy()
+        nue_in_db = nue_in_range & nue_ints.isin(existing_nues).to_numpy()
+        
+        intrinsic = (~nombre_present | anio_null | anio_bad | anio_future | nue_null | nue_bad
+                     | actual_bad | graduacion_bad | promedio_mismatch)
+        clean = ~intrinsic & ~nombre_in_db & ~nue_in_db
+        
+        # Duplicados dentro del archivo: una fila es válida si ninguna fila válida anterior
+        # comparte nombre o NUE. Solo las filas limpias con claves repetidas necesitan
+        # resolverse en orden; el resto se decide con duplicated().
+        valid = clean.copy()
+        clean_idx = np.flatnonzero(clean)
+        clean_nombres = nombres.iloc[clean_idx]
+        clean_nues = pd.Series(nue_key[clean_idx])
+        contested = (clean_nombres.duplicated(keep=False).to_numpy()
+                     | clean_nues.duplicated(keep=False).to_numpy())
+        seen_nombres, seen_nues = set(), set()
+        for i in clean_idx[contested].tolist():
+            if nombres_list[i] in seen_nombres or nue_key[i] in seen_nues:
+                valid[i] = False
+            else:
+                seen_nombres.add(nombres_list[i])
+                seen_nues.add(nue_key[i])
+        
+        # Posición de la primera fila válida de cada clave
+        valid_idx = np.flatnonzero(valid)
+        first_by_nombre = pd.Series(valid_idx, index=nombres.iloc[valid_idx].to_numpy())
+        first_by_nue = pd.Series(valid_idx, index=nue_key[valid_idx])
+        nombre_prior = nombres.map(first_by_nombre).to_numpy(dtype=float, na_value=np.nan)
+        nue_prior = pd.Series(nue_key).map(first_by_nue).to_numpy(dtype=float, na_value=np.nan)
+        nombre_duplicate = nombre_present & (nombre_in_db | (nombre_prior < positions))
+        nue_duplicate = nue_ok & (nue_in_db | (nue_prior < positions))
+        
+        # Errores en el mismo orden que la validación por filas
+        checks = [
+            (~nombre_present, lambda i: ('nombre_estudiante', nombres_list[i],
+                                         'nombre_estudiante es requerido')),
+            (nombre_duplicate, lambda i: ('nombre_estudiante', nombres_list[i],
+                                          f'nombre_estudiante "{nombres_list[i]}" ya existe en la base de datos')),
+            (anio_null, lambda i: ('anio_inicio', anio_raw[i], 'anio_inicio es requerido')),
+            (anio_future, lambda i: ('anio_inicio', int(anio_int[i]),
+                                     f'anio_inicio ({int(anio_int[i])}) no puede ser mayor al año actual ({current_year})')),
+            (anio_bad, lambda i: ('anio_inicio', anio_raw[i], 'anio_inicio debe ser un número válido')),
+            (nue_null, lambda i: ('NUE', nue_raw[i], 'NUE es requerido')),
+            (nue_duplicate, lambda i: ('NUE', int(nue_key[i]),
+                                       f'NUE {int(nue_key[i])} ya existe en la base de datos')),
+            (nue_bad, lambda i: ('NUE', nue_raw[i], 'NUE debe ser un número válido')),
+            (actual_bad, lambda i: ('promedio_actual', actual_raw[i],
+                                    'promedio_actual debe ser un número válido (puede ser decimal)')),
+            (graduacion_bad, lambda i: ('promedio_graduacion', graduacion_raw[i],
+                                        'promedio_graduacion debe ser un número válido (puede ser decimal) o estar vacío')),
+            (promedio_mismatch, lambda i: (
+                'promedio',
+                f'actual: {float(actual[i])}, graduacion: {float(graduacion[i])}',
+                f'Para estudiantes graduados, si ambos promedios están presentes, promedio_actual ({float(actual[i])}) y promedio_graduacion ({float(graduacion[i])}) deben ser iguales'
+            )),
+        ]
+        error_rows = [np.flatnonzero(mask) for mask, _ in checks]
+        error_checks = [np.full(len(rows), k) for k, rows in enumerate(error_rows)]
+        error_rows = np.concatenate(error_rows)
+        error_checks = np.concatenate(error_checks)
+        order = np.lexsort((error_checks, error_rows))
+        if max_errors:
+            order = order[:max(0, max_errors - len(errors))]
+        for i, k in zip(error_rows[order].tolist(), error_checks[order].tolist()):
+            field, value, message = checks[k][1](i)
             errors.append({
-                'row': 0,
-                'field': 'file',
-                'value': '',
-                'message': f'Error al leer el archivo: {str(e)}'
+                'row': row_nums[i],
+                'field': field,
+                'value': value,
+                'message': message
             })
-            return valid_students, errors
+        
+        actual_values = np.where(actual_present, actual, np.nan).tolist()
+        graduacion_values = np.where(graduacion_present, graduacion, np.nan).tolist()
+        for i in valid_idx.tolist():
+            valid_students.append({
+                'nombre_estudiante': nombres_list[i],
+                'nue': int(nue_key[i]),
+                'anio_inicio': int(anio_int[i]),
+                'promedio_actual': actual_values[i] if actual_present[i] else None,
+                'promedio_graduacion': graduacion_values[i] if graduacion_present[i] else None,
+                'graduado': bool(graduado[i])
+            })
+
+    @staticmethod
+    def _row_checks(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """
+        Conversiones y verificaciones que dependen solo de cada fila; es la
+        parte costosa de _validate_columns y puede calcularse por bloques.
+        df ya debe venir de _upcast_like_iterrows.
+        """
+        # nombre_estudiante: str(valor).strip(), 'nan' cuenta como vacío
+        nombres = df['nombre_estudiante'].astype(object).map(str).str.strip()
+        # anio_inicio y NUE: int(float(valor))
+        anio_null, anio_bad, anio_float = StudentController._parse_integer_column(df['anio_inicio'])
+        nue_null, nue_bad, nue_float = StudentController._parse_integer_column(df['NUE'])
+        if 'estado' in df.columns:
+            graduado = (df['estado'].astype(object).map(str).str.strip().str.lower() == 'graduado').to_numpy()
+        else:
+            graduado = np.zeros(len(df), dtype=bool)
+        _, actual_present, actual_bad, actual = \
+            StudentController._parse_decimal_column(df, 'promedio_actual')
+        _, graduacion_present, graduacion_bad, graduacion = \
+            StudentController._parse_decimal_column(df, 'promedio_graduacion')
+        
+        return {
+            'nombres': nombres.to_numpy(dtype=object),
+            'nombre_present': ((nombres != '') & (nombres != 'nan')).to_numpy(),
+            'anio_null': anio_null,
+            'anio_bad': anio_bad,
+            'anio_float': anio_float,
+            'nue_null': nue_null,
+            'nue_bad': nue_bad,
+            'nue_float': nue_float,
+            'graduado': graduado,
+            'actual_present': actual_present,
+            'actual_bad': actual_bad,
+            'actual': actual,
+            'graduacion_present': graduacion_present,
+            'graduacion_bad': graduacion_bad,
+            'graduacion': graduacion
+        }
+
+    @staticmethod
+    def _parallel_row_checks(df: pd.DataFrame) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Calcula _row_checks por bloques contiguos en el pool de procesos y une
+        los resultados en orden. Los duplicados entre bloques y la unicidad en
+        la base de datos se resuelven después sobre el resultado unido, así que
+        los errores quedan en el mismo orden que la validación secuencial.
+        Devuelve None si el pool falla (se valida en el proceso actual).
+        """
+        df = StudentController._upcast_like_iterrows(df)
+        bounds = np.linspace(0, len(df), validation_pool.workers + 1).astype(int)
+        chunks = [df.iloc[start:end] for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+        try:
+            results = validation_pool.map(StudentController._row_checks, chunks)
+        except BrokenProcessPool:
+            return None
+        return {name: np.concatenate([result[name] for result in results]) for name in results[0]}
+
+    @staticmethod
+    def _candidate_keys(df: pd.DataFrame) -> tuple[list, list]:
+        """
+        Nombres y NUEs del archivo que deben verificarse contra la base de datos
+        """
+        df = StudentController._upcast_like_iterrows(df)
+        nombres = df['nombre_estudiante'].astype(object).map(str).str.strip()
+        nombres = nombres[(nombres != '') & (nombres != 'nan')]
+        nue_null, nue_bad, nue_float = StudentController._parse_integer_column(df['NUE'])
+        nue_key = np.trunc(nue_float[~nue_null & ~nue_bad])
+        nue_key = nue_key[np.abs(nue_key) < 2 ** 63]
+        return nombres.unique().tolist(), pd.unique(nue_key.astype(np.int64)).tolist()
+
+    @staticmethod
+    def _upcast_like_iterrows(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        iterrows convierte columnas enteras a float si todas las columnas son numéricas
+        y alguna es float; se replica para que str() y los valores coincidan
+        """
+        dtypes = list(df.dtypes)
+        if (len(dtypes) > 1
+                and all(pd.api.types.is_numeric_dtype(dt) and not pd.api.types.is_bool_dtype(dt)
+                        for dt in dtypes)
+                and any(pd.api.types.is_float_dtype(dt) for dt in dtypes)):
+            return df.astype('float64')
+        return df
+
+    @staticmethod
+    def _to_float(column: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Convierte valores no nulos con la semántica de float(); devuelve (valores, fallidos)
+        """
+        try:
+            return column.astype('float64').to_numpy(), np.zeros(len(column), dtype=bool)
+        except (ValueError, TypeError):
+            values = np.full(len(column), np.nan)
+            failed = np.zeros(len(column), dtype=bool)
+            for i, value in enumerate(column.tolist()):
+                try:
+                    values[i] = float(value)
+                except (ValueError, TypeError):
+                    failed[i] = True
+            return values, failed
+
+    @staticmethod
+    def _parse_integer_column(column: pd.Series) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Devuelve (nulos, inválidos, valores float) para una columna que se convierte con int(float(x))
+        """
+        null = column.isna().to_numpy()
+        values = np.full(len(column), np.nan)
+        bad = np.zeros(len(column), dtype=bool)
+        present = np.flatnonzero(~null)
+        parsed, failed = StudentController._to_float(column.iloc[present])
+        values[present] = parsed
+        # int(float('nan')) lanza ValueError
+        bad[present] = failed | np.isnan(parsed)
+        return null, bad, values
+
+    @staticmethod
+    def _parse_decimal_column(df: pd.DataFrame, name: str) -> tuple[list, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Devuelve (valores originales, presentes, inválidos, valores float) para un promedio opcional
+        """
+        n = len(df)
+        values = np.full(n, np.nan)
+        present = np.zeros(n, dtype=bool)
+        bad = np.zeros(n, dtype=bool)
+        if name not in df.columns:
+            return [None] * n, present, bad, values
+        column = df[name]
+        blank = column.isna().to_numpy() | (column.astype(object).map(str).str.strip() == '').to_numpy()
+        filled = np.flatnonzero(~blank)
+        parsed, failed = StudentController._to_float(column.iloc[filled])
+        values[filled] = np.where(failed, np.nan, parsed)
+        present[filled] = ~failed
+        bad[filled] = failed
+        return column.tolist(), present, bad, values
+
+    @staticmethod
+    def list_students(args) -> tuple[Dict, int]:
+        """
+        Lista estudiantes paginados a partir de los parámetros de la petición:
+        limit, cursor, graduado, anio_inicio_min/max, promedio_min/max, fields
+        y shape (objects: lista de objetos; columns: encabezado y filas como listas)
+        """
+        try:
+            limit = int(args.get('limit', Config.PAGE_SIZE_DEFAULT))
+            after_id = args.get('cursor', type=int)
+            if args.get('cursor') and after_id is None:
+                raise ValueError('cursor')
+            
+            filters = {}
+            graduado = args.get('graduado')
+            if graduado is not None:
+                if graduado.lower() not in ('true', 'false', '1', '0'):
+                    raise ValueError('graduado')
+                filters['graduado'] = graduado.lower() in ('true', '1')
+            for name in ('anio_inicio_min', 'anio_inicio_max'):
+                if args.get(name) is not None:
+                    filters[name] = int(args.get(name))
+            for name in ('promedio_min', 'promedio_max'):
+                if args.get(name) is not None:
+                    filters[name] = float(args.get(name))
+                    # float() acepta inf y nan, que MySQL no puede comparar
+                    if not math.isfinite(filters[name]):
+                        raise ValueError(name)
+        except ValueError:
+            return {'error': 'Parámetros de consulta inválidos'}, 400
+        
+        if limit < 1:
+            return {'error': 'limit debe ser mayor a 0'}, 400
+        limit = min(limit, Config.PAGE_SIZE_MAX)
+        
+        fields = None
+        if args.get('fields'):
+            fields = [f.strip() for f in args.get('fields').split(',') if f.strip()]
+            unknown = [f for f in fields if f not in StudentModel.FIELDS]
+            if unknown:
+                return {'error': f'Campos desconocidos: {", ".join(unknown)}'}, 400
+        
+        shape = args.get('shape', 'objects')
+        if shape not in ('objects', 'columns'):
+            return {'error': 'shape debe ser objects o columns'}, 400
+        
+        # Filas como tuplas; shape=columns las entrega así con un solo encabezado
+        columns = StudentModel.page_columns(fields)
+        rows, next_cursor = StudentModel.get_students_page(limit, after_id, filters, fields, as_tuples=True)
+        if shape == 'columns':
+            return {
+                'columns': columns,
+                'rows': rows,
+                'next_cursor': next_cursor,
+                'limit': limit
+            }, 200
+        return {
+            'items': [dict(zip(columns, row)) for row in rows],
+            'next_cursor': next_cursor,
+            'limit': limit
+        }, 200
+
+    @staticmethod
+    def search_students(args) -> tuple[Dict, int]:
+        """
+        Busca estudiantes por prefijo o subcadena del nombre y por prefijo del
+        NUE (parámetros q y limit). Orden de relevancia: coincidencia exacta,
+        luego prefijo y al final subcadena (por puntaje FULLTEXT).
+        """
+        query = (args.get('q') or '').strip()
+        try:
+            limit = int(args.get('limit', Config.SEARCH_LIMIT_DEFAULT))
+        except ValueError:
+            return {'error': 'Parámetros de consulta inválidos'}, 400
+        
+        if not query:
+            return {'error': 'q es requerido'}, 400
+        if limit < 1:
+            return {'error': 'limit debe ser mayor a 0'}, 400
+        limit = min(limit, Config.SEARCH_LIMIT_MAX)
+        
+        ranked = {}
+        def add(rows, rank):
+            for row in rows:
+                if row['id'] not in ranked:
+                    ranked[row['id']] = (rank, row)
+        
+        if query.isascii() and query.isdigit():
+            rows = StudentModel.search_by_nue_prefix(query, limit)
+            add([row for row in rows if str(row['nue']) == query], 0)
+            add(rows, 1)
+        rows = StudentModel.search_by_nombre_prefix(query, limit)
+        add([row for row in rows if row['nombre_estudiante'].lower() == query.lower()], 0)
+        add(rows, 1)
+        # Las subcadenas solo se buscan si faltan resultados (quedarían al final) y si
+        # la consulta alcanza el tamaño de n-grama del índice
+        if len(ranked) < limit and len(query) >= Config.SEARCH_NGRAM_TOKEN_SIZE:
+            add(StudentModel.search_by_nombre_text(query, limit), 2)
+        
+        matches = ('exacto', 'prefijo', 'texto')
+        items = []
+        for rank, row in sorted(ranked.values(), key=lambda item: item[0])[:limit]:
+            row.pop('score', None)
+            row['match'] = matches[rank]
+            items.append(row)
+        return {
+            'items': items,
+            'limit': limit
+        }, 200
 
     @staticmethod
-    def insert_students(students: List[Dict]) -> Dict:
+    def export_students(export_format: str, compress: bool = False) -> Iterator[bytes]:
+        """
+        Genera la exportación completa en NDJSON o CSV, lote por lote,
+        opcionalmente comprimida con gzip
+        """
+        columns = StudentModel.FIELDS
+        
+        def encode():
+            if export_format == 'csv':
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow(columns)
+                for rows in StudentModel.iter_students():
+                    writer.writerows(rows)
+                    yield buffer.getvalue().encode('utf-8')
+                    buffer.seek(0)
+                    buffer.truncate()
+                if buffer.tell():
+                    yield buffer.getvalue().encode('utf-8')
+            else:
+                for rows in StudentModel.iter_students():
+                    yield b''.join(dumps_bytes(dict(zip(columns, row))) + b'\n' for row in rows)
+        
+        if not compress:
+            yield from encode()
+            return
+        
+        compressor = zlib.compressobj(wbits=31)  # 31 = formato gzip
+        for chunk in encode():
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+
+    @staticmethod
+    def _data_changed() -> None:
+        # Invalida las respuestas en caché y lee del primario mientras la réplica se pone al día
+        response_cache.bump()
+        db_read.mark_write()
+
+    @staticmethod
+    def upsert_students(students: List[Dict], chunk_size: Optional[int] = None, progress=None) -> Dict:
+        """
+        Inserta o actualiza por NUE; devuelve conteos de insertados, actualizados y sin cambios
+        """
+        on_insert = (lambda count: progress.add(rows_inserted=count)) if progress else None
+        started = time.perf_counter()
+        result = StudentModel.upsert_students_bulk(students, chunk_size, on_insert=on_insert)
+        if result['inserted'] or result['updated']:
+            StudentController._data_changed()
+        if progress:
+            progress.add(insert_seconds=time.perf_counter() - started)
+        return result
+
+    @staticmethod
+    def insert_students(students: List[Dict], mode: Optional[str] = None,
+                        chunk_size: Optional[int] = None, progress=None,
+                        atomic: bool = False) -> Dict:
         """
         Inserts valid students into database
+
+        mode='bulk' inserta por bloques (Config.INSERT_CHUNK_SIZE); mode='row'
+        conserva la inserción fila por fila para comparar ambos caminos
+        atomic=True inserta todo en una sola transacción (todos o ninguno)
         """
+        mode = mode or Config.INSERT_MODE
+        on_insert = (lambda count: progress.add(rows_inserted=count)) if progress else None
+        started = time.perf_counter()
+        if atomic or mode == 'bulk':
+            insert = StudentModel.create_students_atomic if atomic else StudentModel.create_students_bulk
+            result = insert(students, chunk_size, on_insert=on_insert)
+            if result['inserted']:
+                StudentController._data_changed()
+            if progress:
+                progress.add(insert_seconds=time.perf_counter() - started)
+            return result
+        
         inserted = 0
         errors = []
         
@@ -207,14 +1239,20 @@ class StudentController:
                     graduado=student['graduado']
                 )
                 inserted += 1
+                if on_insert:
+                    on_insert(1)
             except Exception as e:
                 errors.append({
                     'student': student['nombre_estudiante'],
                     'error': str(e)
                 })
         
+        if inserted:
+            StudentController._data_changed()
+        if progress:
+            progress.add(insert_seconds=time.perf_counter() - started)
+        
         return {
             'inserted': inserted,
             'errors': errors
         }
-
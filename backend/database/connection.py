@@ -1,36 +1,267 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
 import mysql.connector
 from mysql.connector import Error
 from config import Config
+from services.metrics import InstrumentedConnection
 
-class DatabaseConnection:
-    _instance = None
-    _connection = None
+class PoolTimeoutError(Exception):
+    """No se obtuvo una conexión del pool dentro del tiempo de espera"""
+    pass
 
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(DatabaseConnection, cls).__new__(cls)
-        return cls._instance
+class ConnectionSource:
+    """
+    Origen de conexiones con acquire/release; connection() las entrega como
+    administrador de contexto
+    """
 
-    def get_connection(self):
-        if self._connection is None or not self._connection.is_connected():
+    def acquire(self):
+        raise NotImplementedError
+
+    def release(self, connection, discard=False):
+        raise NotImplementedError
+
+    @contextmanager
+    def connection(self):
+        """
+        Entrega una conexión del pool y la devuelve al salir del bloque
+        """
+        connection = self.acquire()
+        discard = False
+        try:
+            yield connection
+        except Error:
+            # Un error de MySQL puede dejar la conexión en un estado inconsistente
+            discard = not connection.is_connected()
+            raise
+        finally:
+            self.release(connection, discard=discard)
+
+class ConnectionPool(ConnectionSource):
+    """
+    Pool de conexiones MySQL seguro entre hilos.
+
+    Mantiene hasta pool_size conexiones inactivas y permite max_overflow
+    conexiones adicionales bajo carga. Al entregar una conexión se verifica
+    que siga viva y se recicla si supera recycle segundos de antigüedad.
+    """
+
+    def __init__(self, pool_size=5, max_overflow=10, timeout=30, recycle=3600,
+                 pre_ping=True, **connect_args):
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        self.pre_ping = pre_ping
+        self._connect_args = connect_args
+        self._idle = []  # (conexión, creada_en), LIFO para reutilizar las conexiones calientes
+        self._created_at = {}
+        self._total = 0
+        self._in_use = 0
+        self._cond = threading.Condition()
+        self._stats = {
+            'checkouts': 0,
+            'waits': 0,
+            'wait_time_total': 0.0,
+            'wait_time_max': 0.0,
+            'timeouts': 0,
+            'created': 0,
+            'recycled': 0,
+            'failed_pings': 0
+        }
+
+    def _connect(self):
+        try:
+            connection = mysql.connector.connect(**self._connect_args)
+        except Error as e:
+            print(f"Error connecting to MySQL: {e}")
+            raise
+        if Config.METRICS_ENABLED:
+            # Los cursores de la conexión quedan medidos para /metrics
+            connection = InstrumentedConnection(connection)
+        self._created_at[id(connection)] = time.monotonic()
+        with self._cond:
+            self._stats['created'] += 1
+        return connection
+
+    def _discard(self, connection):
+        self._created_at.pop(id(connection), None)
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def acquire(self):
+        start = time.monotonic()
+        deadline = start + self.timeout
+        connection = None
+        waited = False
+
+        with self._cond:
+            while True:
+                if self._idle:
+                    connection = self._idle.pop()
+                    break
+                if self._total < self.pool_size + self.max_overflow:
+                    self._total += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise PoolTimeoutError(
+                        f'No hay conexiones disponibles después de {self.timeout} segundos')
+                waited = True
+                self._cond.wait(remaining)
+
+            self._in_use += 1
+            wait_time = time.monotonic() - start
+            self._stats['checkouts'] += 1
+            if waited:
+                self._stats['waits'] += 1
+            self._stats['wait_time_total'] += wait_time
+            self._stats['wait_time_max'] = max(self._stats['wait_time_max'], wait_time)
+
+        try:
+            return self._checkout(connection)
+        except Exception:
+            with self._cond:
+                self._total -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+    def _checkout(self, connection):
+        if connection is None:
+            return self._connect()
+
+        age = time.monotonic() - self._created_at.get(id(connection), 0)
+        if self.recycle is not None and age > self.recycle:
+            self._discard(connection)
+            with self._cond:
+                self._stats['recycled'] += 1
+            return self._connect()
+
+        if self.pre_ping:
+            try:
+                connection.ping(reconnect=False)
+            except Exception:
+                self._discard(connection)
+                with self._cond:
+                    self._stats['failed_pings'] += 1
+                return self._connect()
+
+        return connection
+
+    def release(self, connection, discard=False):
+        if not discard:
             try:
-                self._connection = mysql.connector.connect(
-                    host=Config.DB_HOST,
-                    user=Config.DB_USER,
-                    password=Config.DB_PASSWORD,
-                    database=Config.DB_NAME,
-                    charset='utf8mb4',
-                    collation='utf8mb4_unicode_ci'
-                )
-            except Error as e:
-                print(f"Error connecting to MySQL: {e}")
+                # No dejar transacciones abiertas (ni snapshots de lectura) en el pool
+                if connection.in_transaction:
+                    connection.rollback()
+            except Exception:
+                discard = True
+
+        with self._cond:
+            self._in_use -= 1
+            if discard or len(self._idle) >= self.pool_size:
+                self._total -= 1
+                self._discard(connection)
+            else:
+                self._idle.append(connection)
+            self._cond.notify()
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                'pool_size': self.pool_size,
+                'max_overflow': self.max_overflow,
+                'total': self._total,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'wait_time_avg': (stats['wait_time_total'] / stats['checkouts']
+                                  if stats['checkouts'] else 0.0)
+            })
+            return stats
+
+    def close_all(self):
+        with self._cond:
+            while self._idle:
+                self._total -= 1
+                self._discard(self._idle.pop())
+
+class ReadRouter(ConnectionSource):
+    """
+    Conexiones para lecturas: usa el pool de la réplica si existe y el
+    primario si no. Durante read_your_writes segundos después de mark_write()
+    las lecturas van al primario, para que una importación recién terminada se
+    vea aunque la réplica tenga retraso. Si la réplica no entrega una conexión
+    (caída o pool agotado) se lee del primario.
+    """
+
+    def __init__(self, primary: ConnectionPool, replica: Optional[ConnectionPool] = None,
+                 read_your_writes: float = 0):
+        self.primary = primary
+        self.replica = replica
+        self.read_your_writes = read_your_writes
+        self._primary_until = 0.0
+        self._owners = {}  # id(conexión) -> pool que la entregó
+        self._lock = threading.Lock()
+
+    def mark_write(self) -> None:
+        with self._lock:
+            self._primary_until = time.monotonic() + self.read_your_writes
+
+    def _pool(self) -> ConnectionPool:
+        if self.replica is None or time.monotonic() < self._primary_until:
+            return self.primary
+        return self.replica
+
+    def acquire(self):
+        pool = self._pool()
+        try:
+            connection = pool.acquire()
+        except (Error, PoolTimeoutError):
+            if pool is self.primary:
                 raise
-        return self._connection
+            pool = self.primary
+            connection = pool.acquire()
+        with self._lock:
+            self._owners[id(connection)] = pool
+        return connection
+
+    def release(self, connection, discard=False):
+        with self._lock:
+            pool = self._owners.pop(id(connection), self.primary)
+        pool.release(connection, discard=discard)
 
-    def close_connection(self):
-        if self._connection and self._connection.is_connected():
-            self._connection.close()
-            self._connection = None
+def _create_pool(host, port, user, password, pool_size, max_overflow) -> ConnectionPool:
+    return ConnectionPool(
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        timeout=Config.DB_POOL_TIMEOUT,
+        recycle=Config.DB_POOL_RECYCLE,
+        pre_ping=Config.DB_POOL_PRE_PING,
+        host=host,
+        port=port,
+        user=user,
+        password=password,
+        database=Config.DB_NAME,
+        charset='utf8mb4',
+        collation='utf8mb4_unicode_ci'
+    )
 
-db = DatabaseConnection()
+# Primario: escrituras y lecturas que deben ver el último estado (unicidad, usuarios)
+db = _create_pool(Config.DB_HOST, Config.DB_PORT, Config.DB_USER, Config.DB_PASSWORD,
+                  Config.DB_POOL_SIZE, Config.DB_POOL_MAX_OVERFLOW)
 
+# Lecturas del dashboard y listados; sin DB_READ_HOST todo va al primario
+db_read = ReadRouter(
+    db,
+    replica=_create_pool(Config.DB_READ_HOST, Config.DB_READ_PORT, Config.DB_READ_USER,
+                         Config.DB_READ_PASSWORD, Config.DB_READ_POOL_SIZE,
+                         Config.DB_READ_POOL_MAX_OVERFLOW) if Config.DB_READ_HOST else None,
+    read_your_writes=Config.READ_YOUR_WRITES_SECONDS
+)
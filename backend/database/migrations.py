@@ -0,0 +1,160 @@
+"""
+Migraciones de esquema versionadas.
+
+Cada migración tiene una versión, una descripción y una función que recibe
+un cursor. Se aplican en orden y cada versión aplicada se registra en
+schema_migrations. Las funciones son idempotentes (verifican antes de crear),
+así que repetir una migración sobre un esquema que ya la tiene no falla.
+"""
+
+def _existing_indexes(cursor, table):
+    cursor.execute("""
+        SELECT DISTINCT index_name FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s
+    """, (table,))
+    return {row[0] for row in cursor.fetchall()}
+
+def _create_indexes(cursor, table, indexes):
+    """Crea los índices que falten (MySQL no soporta CREATE INDEX IF NOT EXISTS)"""
+    existing = _existing_indexes(cursor, table)
+    for name, columns in indexes.items():
+        if name not in existing:
+            cursor.execute(f"CREATE INDEX {name} ON {table} {columns}")
+
+def listing_indexes(cursor):
+    # Filtros del listado paginado (InnoDB agrega el id al final de cada índice)
+    _create_indexes(cursor, 'students', {
+        'idx_students_graduado': '(graduado)',
+        'idx_students_anio_inicio': '(anio_inicio)',
+        'idx_students_promedio_actual': '(promedio_actual)'
+    })
+
+def student_stats_table(cursor):
+    # Resumen de estadísticas del dashboard, mantenido por las inserciones
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS student_stats (
+            graduado TINYINT NOT NULL,
+            anio_inicio INT NOT NULL,
+            student_count BIGINT NOT NULL DEFAULT 0,
+            promedio_sum DECIMAL(20,2) NOT NULL DEFAULT 0,
+            promedio_count BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (graduado, anio_inicio)
+        )
+    """)
+
+def aggregate_covering_indexes(cursor):
+    # Índice cubriente para los agregados por estado y año (reconstrucción del
+    # resumen): se resuelven leyendo solo el índice, sin tocar las filas.
+    # El índice simple de graduado se conserva porque entrega el orden por id
+    # que usa el listado filtrado.
+    _create_indexes(cursor, 'students', {
+        'idx_students_graduado_anio_promedio': '(graduado, anio_inicio, promedio_actual)'
+    })
+
+def nombre_fulltext_index(cursor):
+    # Búsqueda por subcadena del nombre: FULLTEXT con parser ngram (los
+    # n-gramas de ngram_token_size caracteres permiten coincidencias en medio
+    # de una palabra). Crear el primer índice FULLTEXT reconstruye la tabla.
+    if 'ft_students_nombre' not in _existing_indexes(cursor, 'students'):
+        cursor.execute("ALTER TABLE students ADD FULLTEXT INDEX ft_students_nombre "
+                       "(nombre_estudiante) WITH PARSER ngram")
+
+def content_hash_column(cursor):
+    # Huella de los datos de cada estudiante para el modo upsert. Las filas
+    # existentes quedan con NULL y se consideran cambiadas en su primer upsert.
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = 'students' AND column_name = 'content_hash'
+    """)
+    if cursor.fetchone()[0] == 0:
+        cursor.execute("ALTER TABLE students ADD COLUMN content_hash CHAR(40) NULL")
+
+MIGRATIONS = [
+    (1, 'Índices para filtros del listado de estudiantes', listing_indexes),
+    (2, 'Tabla de resumen student_stats', student_stats_table),
+    (3, 'Índice cubriente para agregados del dashboard', aggregate_covering_indexes),
+    (4, 'Índice FULLTEXT ngram para búsqueda por nombre', nombre_fulltext_index),
+    (5, 'Columna content_hash para el modo upsert', content_hash_column),
+]
+
+def applied_versions(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            description VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+def run_migrations(connection):
+    """
+    Aplica en orden las migraciones pendientes y devuelve las versiones aplicadas.
+    El DDL de MySQL confirma implícitamente, por eso cada versión se registra
+    en cuanto termina su migración.
+    """
+    cursor = connection.cursor()
+    applied = []
+    try:
+        done = applied_versions(cursor)
+        for version, description, migrate in sorted(MIGRATIONS, key=lambda m: m[0]):
+            if version in done:
+                continue
+            migrate(cursor)
+            cursor.execute(
+                "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                (version, description)
+            )
+            connection.commit()
+            applied.append(version)
+        return applied
+    finally:
+        cursor.close()
+
+# Consultas frecuentes y parámetros de ejemplo para verificar su plan
+HOT_QUERIES = {
+    'listado': (
+        "SELECT id, nombre_estudiante, nue FROM students ORDER BY id DESC LIMIT 51", ()),
+    'listado por graduado': (
+        "SELECT id FROM students WHERE graduado = %s ORDER BY id DESC LIMIT 51", (1,)),
+    'listado por año': (
+        "SELECT id FROM students WHERE anio_inicio >= %s AND anio_inicio <= %s "
+        "ORDER BY id DESC LIMIT 51", (2018, 2020)),
+    'listado por promedio': (
+        "SELECT id FROM students WHERE promedio_actual >= %s ORDER BY id DESC LIMIT 51", (9.5,)),
+    'unicidad por nombre': (
+        "SELECT nombre_estudiante FROM students WHERE nombre_estudiante IN (%s, %s)", ('a', 'b')),
+    'unicidad por NUE': (
+        "SELECT nue FROM students WHERE nue IN (%s, %s)", (1, 2)),
+    'búsqueda por prefijo de nombre': (
+        "SELECT id FROM students WHERE nombre_estudiante LIKE %s "
+        "ORDER BY nombre_estudiante LIMIT 20", ('Ana%',)),
+    'búsqueda por texto de nombre': (
+        "SELECT id FROM students WHERE MATCH(nombre_estudiante) "
+        "AGAINST (%s IN BOOLEAN MODE) LIMIT 20", ('"mar"',)),
+    'búsqueda por prefijo de NUE': (
+        "SELECT id FROM students WHERE nue BETWEEN %s AND %s OR nue BETWEEN %s AND %s "
+        "ORDER BY nue LIMIT 20", (12, 12, 120, 129)),
+    'agregado por estado y año': (
+        "SELECT COALESCE(graduado, -1), anio_inicio, COUNT(*), SUM(promedio_actual), "
+        "COUNT(promedio_actual) FROM students GROUP BY COALESCE(graduado, -1), anio_inicio", ()),
+}
+
+def check_query_plans(connection):
+    """
+    Ejecuta EXPLAIN sobre las consultas frecuentes y devuelve
+    [(nombre, tabla, tipo de acceso, índice, filas estimadas, es_escaneo_completo)].
+    type = ALL indica un escaneo completo de la tabla.
+    """
+    cursor = connection.cursor(dictionary=True)
+    results = []
+    try:
+        for name, (query, params) in HOT_QUERIES.items():
+            cursor.execute(f"EXPLAIN {query}", params)
+            for row in cursor.fetchall():
+                results.append((name, row.get('table'), row.get('type'), row.get('key'),
+                                row.get('rows'), row.get('type') == 'ALL'))
+        return results
+    finally:
+        cursor.close()
@@ -1,17 +1,25 @@
 """
 Script para inicializar la base de datos y crear un usuario por defecto
+
+    python init_db.py                  crea tablas, aplica migraciones y el usuario por defecto
+    python init_db.py --rebuild-stats  recalcula el resumen de estadísticas
+    python init_db.py --explain        verifica el plan (EXPLAIN) de las consultas frecuentes
 """
 from database.connection import db
 from models.user_model import UserModel
+from models.student_model import StudentModel
+import sys
 import mysql.connector
 from config import Config
+from database.migrations import run_migrations, check_query_plans
 
 def init_database():
-    """Crea las tablas si no existen"""
+    """Crea las tablas si no existen y aplica las migraciones pendientes"""
     try:
         # Connect without database first
         connection = mysql.connector.connect(
             host=Config.DB_HOST,
+            port=Config.DB_PORT,
             user=Config.DB_USER,
             password=Config.DB_PASSWORD
         )
@@ -45,6 +53,10 @@ def init_database():
         
         connection.commit()
         cursor.close()
+        
+        applied = run_migrations(connection)
+        if applied:
+            print(f"Migraciones aplicadas: {', '.join(str(v) for v in applied)}")
         connection.close()
         
         print("Base de datos inicializada correctamente")
@@ -70,9 +82,45 @@ def create_default_user():
     except Exception as e:
         print(f"Error al crear usuario por defecto: {e}")
 
+def rebuild_statistics():
+    """Recalcula el resumen student_stats desde la tabla students"""
+    try:
+        StudentModel.rebuild_statistics()
+        print("Resumen de estadísticas recalculado")
+    except Exception as e:
+        print(f"Error al recalcular el resumen de estadísticas: {e}")
+
+def explain_hot_queries():
+    """Muestra el plan de las consultas frecuentes y señala escaneos completos"""
+    connection = mysql.connector.connect(
+        host=Config.DB_HOST,
+        port=Config.DB_PORT,
+        user=Config.DB_USER,
+        password=Config.DB_PASSWORD,
+        database=Config.DB_NAME
+    )
+    try:
+        full_scans = 0
+        for name, table, access, key, rows, full_scan in check_query_plans(connection):
+            marker = 'ESCANEO COMPLETO' if full_scan else 'ok'
+            print(f"{name:<28} {table or '-':<16} type={access or '-':<8} key={key or '-':<40} rows={rows} {marker}")
+            full_scans += full_scan
+        return full_scans == 0
+    finally:
+        connection.close()
+
 if __name__ == '__main__':
+    if '--rebuild-stats' in sys.argv:
+        rebuild_statistics()
+        sys.exit(0)
+    
+    if '--explain' in sys.argv:
+        sys.exit(0 if explain_hot_queries() else 1)
+    
     print("Inicializando base de datos...")
     if init_database():
+        print("\nRecalculando resumen de estadísticas...")
+        rebuild_statistics()
         print("\nCreando usuario por defecto...")
         create_default_user()
         print("\n¡Inicialización completada!")
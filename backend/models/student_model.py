@@ -1,107 +1,646 @@
-from database.connection import db
-from typing import List, Dict, Optional
+from database.connection import db, db_read
+from config import Config
+from typing import Callable, Iterator, List, Dict, Optional
+from decimal import Decimal, ROUND_HALF_UP
+import hashlib
 
 class StudentModel:
+    FIELDS = ['id', 'nombre_estudiante', 'nue', 'anio_inicio', 'promedio_actual',
+              'promedio_graduacion', 'graduado']
+    # Filtros del listado y su condición SQL
+    FILTERS = {
+        'graduado': 'graduado = %s',
+        'anio_inicio_min': 'anio_inicio >= %s',
+        'anio_inicio_max': 'anio_inicio <= %s',
+        'promedio_min': 'promedio_actual >= %s',
+        'promedio_max': 'promedio_actual <= %s'
+    }
+
+    INSERT_QUERY = """INSERT INTO students 
+                   (nombre_estudiante, nue, anio_inicio, promedio_actual, 
+                    promedio_graduacion, graduado, content_hash) 
+                   VALUES (%s, %s, %s, %s, %s, %s, %s)"""
+
+    # La fila se identifica por nue; solo se usa con filas nuevas o con cambios
+    UPSERT_QUERY = INSERT_QUERY + """
+                   ON DUPLICATE KEY UPDATE
+                       nombre_estudiante = VALUES(nombre_estudiante),
+                       anio_inicio = VALUES(anio_inicio),
+                       promedio_actual = VALUES(promedio_actual),
+                       promedio_graduacion = VALUES(promedio_graduacion),
+                       graduado = VALUES(graduado),
+                       content_hash = VALUES(content_hash)"""
+
     @staticmethod
     def create_student(nombre_estudiante, nue, anio_inicio, promedio_actual=None, 
                       promedio_graduacion=None, graduado=False):
-        connection = db.get_connection()
-        cursor = connection.cursor()
+        with db.connection() as connection:
+            cursor = connection.cursor()
+            
+            try:
+                student = {
+                    'nombre_estudiante': nombre_estudiante,
+                    'nue': nue,
+                    'anio_inicio': anio_inicio,
+                    'promedio_actual': promedio_actual,
+                    'promedio_graduacion': promedio_graduacion,
+                    'graduado': graduado
+                }
+                cursor.execute(StudentModel.INSERT_QUERY, StudentModel._student_params(student))
+                student_id = cursor.lastrowid
+                StudentModel._apply_statistics(cursor, [student])
+                connection.commit()
+                return student_id
+            except Exception as e:
+                connection.rollback()
+                raise e
+            finally:
+                cursor.close()
+
+    @staticmethod
+    def _student_params(student: Dict) -> tuple:
+        return (student['nombre_estudiante'], student['nue'], student['anio_inicio'],
+                student['promedio_actual'], student['promedio_graduacion'], student['graduado'],
+                StudentModel.content_hash(student))
+
+    @staticmethod
+    def content_hash(student: Dict) -> str:
+        """
+        Huella de los datos de un estudiante tal como quedan guardados (promedios
+        redondeados a DECIMAL(5,2)); dos filas con la misma huella son iguales
+        """
+        def decimal_text(value):
+            return '' if value is None else str(StudentModel._to_decimal(value))
         
-        try:
-            cursor.execute(
-                """INSERT INTO students 
-                   (nombre_estudiante, nue, anio_inicio, promedio_actual, 
-                    promedio_graduacion, graduado) 
-                   VALUES (%s, %s, %s, %s, %s, %s)""",
-                (nombre_estudiante, nue, anio_inicio, promedio_actual, 
-                 promedio_graduacion, graduado)
-            )
-            connection.commit()
-            return cursor.lastrowid
-        except Exception as e:
-            connection.rollback()
-            raise e
-        finally:
-            cursor.close()
+        graduado = student['graduado']
+        content = '\x1f'.join([
+            str(student['nombre_estudiante']),
+            str(student['nue']),
+            str(student['anio_inicio']),
+            decimal_text(student['promedio_actual']),
+            decimal_text(student['promedio_graduacion']),
+            '' if graduado is None else str(int(bool(graduado)))
+        ])
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def create_students_bulk(students: List[Dict], chunk_size: Optional[int] = None,
+                             on_insert: Optional[Callable[[int], None]] = None) -> Dict:
+        """
+        Inserta estudiantes en bloques con executemany (INSERT multi-fila),
+        una transacción por bloque que también actualiza el resumen
+        student_stats. Si un bloque falla se revierte y solo ese
+        bloque se reintenta fila por fila para reportar los errores individuales.
+        on_insert recibe la cantidad de filas confirmadas en cada commit.
+        """
+        chunk_size = chunk_size or Config.INSERT_CHUNK_SIZE
+        with db.connection() as connection:
+            cursor = connection.cursor()
+            inserted = 0
+            errors = []
+            
+            try:
+                for start in range(0, len(students), chunk_size):
+                    chunk = students[start:start + chunk_size]
+                    try:
+                        cursor.executemany(StudentModel.INSERT_QUERY,
+                                           [StudentModel._student_params(s) for s in chunk])
+                        StudentModel._apply_statistics(cursor, chunk)
+                        connection.commit()
+                        inserted += len(chunk)
+                        if on_insert:
+                            on_insert(len(chunk))
+                        continue
+                    except Exception:
+                        connection.rollback()
+                
+                    for student in chunk:
+                        try:
+                            cursor.execute(StudentModel.INSERT_QUERY, StudentModel._student_params(student))
+                            StudentModel._apply_statistics(cursor, [student])
+                            connection.commit()
+                            inserted += 1
+                            if on_insert:
+                                on_insert(1)
+                        except Exception as e:
+                            connection.rollback()
+                            errors.append({
+                                'student': student['nombre_estudiante'],
+                                'error': str(e)
+                            })
+            
+                return {
+                    'inserted': inserted,
+                    'errors': errors
+                }
+            finally:
+                cursor.close()
+
+    @staticmethod
+    def create_students_atomic(students: List[Dict], chunk_size: Optional[int] = None,
+                               on_insert: Optional[Callable[[int], None]] = None) -> Dict:
+        """
+        Inserta todos los estudiantes en una sola transacción (por bloques de
+        executemany): se confirman todos o ninguno. Si un bloque falla se revierte
+        todo y se repite fila por fila dentro de una transacción para identificar
+        las filas con error; con algún error no se confirma nada.
+        """
+        chunk_size = chunk_size or Config.INSERT_CHUNK_SIZE
+        with db.connection() as connection:
+            cursor = connection.cursor()
+            
+            try:
+                try:
+                    for start in range(0, len(students), chunk_size):
+                        chunk = students[start:start + chunk_size]
+                        cursor.executemany(StudentModel.INSERT_QUERY,
+                                           [StudentModel._student_params(s) for s in chunk])
+                        StudentModel._apply_statistics(cursor, chunk)
+                    connection.commit()
+                    if on_insert and students:
+                        on_insert(len(students))
+                    return {'inserted': len(students), 'errors': []}
+                except Exception:
+                    connection.rollback()
+                
+                # InnoDB revierte solo la sentencia que falla, la transacción sigue abierta
+                errors = []
+                for student in students:
+                    try:
+                        cursor.execute(StudentModel.INSERT_QUERY, StudentModel._student_params(student))
+                    except Exception as e:
+                        errors.append({
+                            'student': student['nombre_estudiante'],
+                            'error': str(e)
+                        })
+                if errors:
+                    connection.rollback()
+                    return {'inserted': 0, 'errors': errors}
+                StudentModel._apply_statistics(cursor, students)
+                connection.commit()
+                if on_insert and students:
+                    on_insert(len(students))
+                return {'inserted': len(students), 'errors': []}
+            except Exception:
+                connection.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    @staticmethod
+    def upsert_students_bulk(students: List[Dict], chunk_size: Optional[int] = None,
+                             on_insert: Optional[Callable[[int], None]] = None) -> Dict:
+        """
+        Inserta o actualiza estudiantes por nue, en bloques. En cada transacción
+        se bloquean las filas existentes del bloque por nue y por nombre
+        (SELECT ... FOR UPDATE); un nombre que ya pertenece a otro nue es un
+        error de esa fila. Luego se comparan las huellas y solo las filas
+        nuevas o con cambios se escriben con INSERT ... ON DUPLICATE KEY
+        UPDATE; el resumen student_stats resta
+        los valores anteriores y suma los nuevos. Si un bloque falla se
+        reintenta fila por fila como en create_students_bulk.
+        """
+        chunk_size = chunk_size or Config.INSERT_CHUNK_SIZE
+        with db.connection() as connection:
+            cursor = connection.cursor(dictionary=True)
+            counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+            errors = []
+            
+            def write(batch):
+                # Devuelve (insertados, actualizados, sin cambios) sin confirmar
+                stored = StudentModel._lock_stored_rows(cursor, batch)
+                # Una fila bloqueada con otro nue solo pudo llegar por el nombre (según
+                # la collation de la columna, que ignora mayúsculas y acentos); el UPSERT
+                # la sobrescribiría. En un bloque no se sabe qué estudiante choca: el
+                # reintento fila por fila deja el error en el estudiante exacto.
+                nues = {student['nue'] for student in batch}
+                conflicts = [nue for nue in stored if nue not in nues]
+                if conflicts:
+                    raise ValueError(
+                        f'nombre_estudiante ya existe en la base de datos con el NUE {conflicts[0]}')
+                changed, previous = [], []
+                inserted = unchanged = 0
+                for student in batch:
+                    row = stored.get(student['nue'])
+                    if row is None:
+                        inserted += 1
+                    elif row['content_hash'] == StudentModel.content_hash(student):
+                        unchanged += 1
+                        continue
+                    else:
+                        previous.append(row)
+                    changed.append(student)
+                if changed:
+                    cursor.executemany(StudentModel.UPSERT_QUERY,
+                                       [StudentModel._student_params(s) for s in changed])
+                    if previous:
+                        StudentModel._apply_statistics(cursor, previous, sign=-1)
+                    StudentModel._apply_statistics(cursor, changed)
+                return inserted, len(previous), unchanged
+            
+            def record(result):
+                for key, value in zip(('inserted', 'updated', 'unchanged'), result):
+                    counts[key] += value
+                if on_insert and result[0] + result[1]:
+                    on_insert(result[0] + result[1])
+            
+            try:
+                for start in range(0, len(students), chunk_size):
+                    chunk = students[start:start + chunk_size]
+                    try:
+                        result = write(chunk)
+                        connection.commit()
+                        record(result)
+                        continue
+                    except Exception:
+                        connection.rollback()
+                    
+                    for student in chunk:
+                        try:
+                            result = write([student])
+                            connection.commit()
+                            record(result)
+                        except Exception as e:
+                            connection.rollback()
+                            errors.append({
+                                'student': student['nombre_estudiante'],
+                                'error': str(e)
+                            })
+                
+                return dict(counts, errors=errors)
+            finally:
+                cursor.close()
+
+    @staticmethod
+    def _lock_stored_rows(cursor, students: List[Dict]) -> Dict[int, Dict]:
+        """
+        Filas guardadas con el nue o el nombre de alguno de los estudiantes
+        (bloqueadas hasta el fin de la transacción), por nue, con los campos
+        que necesita el resumen de estadísticas
+        """
+        if not students:
+            return {}
+        nues = [s['nue'] for s in students]
+        nombres = [s['nombre_estudiante'] for s in students]
+        cursor.execute(
+            "SELECT nue, content_hash, graduado, anio_inicio, promedio_actual "
+            f"FROM students WHERE nue IN ({', '.join(['%s'] * len(nues))}) "
+            f"OR nombre_estudiante IN ({', '.join(['%s'] * len(nombres))}) FOR UPDATE",
+            tuple(nues) + tuple(nombres)
+        )
+        return {row['nue']: row for row in cursor.fetchall()}
+
+    @staticmethod
+    def find_nues_by_nombre(nombres: List[str], batch_size: Optional[int] = None) -> Dict[str, int]:
+        """
+        nue guardado de cada nombre de la lista que ya existe en la tabla
+        """
+        batch_size = batch_size or Config.UNIQUENESS_BATCH_SIZE
+        found = {}
+        
+        with db.connection() as connection:
+            cursor = connection.cursor()
+            
+            try:
+                for start in range(0, len(nombres), batch_size):
+                    batch = nombres[start:start + batch_size]
+                    placeholders = ', '.join(['%s'] * len(batch))
+                    cursor.execute(
+                        f"SELECT nombre_estudiante, nue FROM students WHERE nombre_estudiante IN ({placeholders})",
+                        tuple(batch)
+                    )
+                    found.update((nombre, nue) for nombre, nue in cursor.fetchall())
+                
+                return found
+            finally:
+                cursor.close()
 
     @staticmethod
     def get_all_students():
-        connection = db.get_connection()
-        cursor = connection.cursor(dictionary=True)
+        with db_read.connection() as connection:
+            cursor = connection.cursor(dictionary=True)
+            
+            try:
+                cursor.execute("SELECT * FROM students ORDER BY id DESC")
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+
+    @staticmethod
+    def find_existing_keys(nombres: List[str], nues: List[int],
+                           batch_size: Optional[int] = None) -> tuple[set, set]:
+        """
+        Devuelve (nombres, nues) de la lista que ya existen en la tabla.
+        Consulta por lotes de IN (...) sobre las llaves únicas, así el costo
+        depende del tamaño del archivo y no del tamaño de la tabla.
+        """
+        batch_size = batch_size or Config.UNIQUENESS_BATCH_SIZE
+        existing_nombres = set()
+        existing_nues = set()
         
-        try:
-            cursor.execute("SELECT * FROM students ORDER BY id DESC")
-            return cursor.fetchall()
-        finally:
-            cursor.close()
+        with db.connection() as connection:
+            cursor = connection.cursor()
+            
+            try:
+                for column, values, found in (('nombre_estudiante', nombres, existing_nombres),
+                                              ('nue', nues, existing_nues)):
+                    for start in range(0, len(values), batch_size):
+                        batch = values[start:start + batch_size]
+                        placeholders = ', '.join(['%s'] * len(batch))
+                        cursor.execute(
+                            f"SELECT {column} FROM students WHERE {column} IN ({placeholders})",
+                            tuple(batch)
+                        )
+                        found.update(row[0] for row in cursor.fetchall())
+                
+                return existing_nombres, existing_nues
+            finally:
+                cursor.close()
 
     @staticmethod
-    def get_student_by_nombre(nombre_estudiante):
-        connection = db.get_connection()
-        cursor = connection.cursor(dictionary=True)
+    def iter_students(batch_size: Optional[int] = None) -> Iterator[List[tuple]]:
+        """
+        Recorre toda la tabla con un cursor no almacenado (del lado del servidor)
+        y entrega lotes de tuplas en el orden de FIELDS; la memoria usada es la
+        de un lote sin importar cuántos estudiantes existan.
+        """
+        batch_size = batch_size or Config.EXPORT_BATCH_SIZE
+        connection = db_read.acquire()
+        cursor = connection.cursor(buffered=False)
+        finished = False
         
         try:
-            cursor.execute("SELECT * FROM students WHERE nombre_estudiante = %s", 
-                          (nombre_estudiante,))
-            return cursor.fetchone()
+            cursor.execute(f"SELECT {', '.join(StudentModel.FIELDS)} FROM students ORDER BY id")
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+            finished = True
         finally:
-            cursor.close()
+            # Si el consumidor se detiene antes, quedan filas sin leer y la
+            # conexión no puede reutilizarse: se descarta en lugar de vaciarla
+            if finished:
+                cursor.close()
+            db_read.release(connection, discard=not finished)
+
+    @staticmethod
+    def page_columns(fields: Optional[List[str]] = None) -> List[str]:
+        """
+        Columnas de get_students_page: id primero y luego fields (o FIELDS)
+        """
+        return ['id'] + [f for f in (fields or StudentModel.FIELDS) if f != 'id']
+
+    @staticmethod
+    def get_students_page(limit: int, after_id: Optional[int] = None, filters: Optional[Dict] = None,
+                          fields: Optional[List[str]] = None,
+                          as_tuples: bool = False) -> tuple[List, Optional[int]]:
+        """
+        Página de estudiantes ordenada por id descendente con paginación por
+        llave (WHERE id < after_id), así cada página cuesta lo mismo sin importar
+        el tamaño de la tabla. Devuelve (filas, siguiente cursor o None).
+        as_tuples=True devuelve tuplas en el orden de page_columns(fields) en
+        lugar de un diccionario por fila.
+        """
+        filters = filters or {}
+        columns = StudentModel.page_columns(fields)
+        conditions = []
+        params = []
+        
+        if after_id is not None:
+            conditions.append('id < %s')
+            params.append(after_id)
+        for name, clause in StudentModel.FILTERS.items():
+            if filters.get(name) is not None:
+                conditions.append(clause)
+                params.append(filters[name])
+        
+        query = f"SELECT {', '.join(columns)} FROM students"
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        query += ' ORDER BY id DESC LIMIT %s'
+        params.append(limit + 1)
+        
+        with db_read.connection() as connection:
+            cursor = connection.cursor(dictionary=not as_tuples)
+            
+            try:
+                cursor.execute(query, tuple(params))
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+        
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = rows[limit - 1][0 if as_tuples else 'id']
+        return rows[:limit], next_cursor
+
+    # Mayor valor de un BIGINT con signo (tipo de la columna nue)
+    NUE_MAX = 2 ** 63 - 1
+
+    @staticmethod
+    def _fetch_search(query: str, params: tuple) -> List[Dict]:
+        with db_read.connection() as connection:
+            cursor = connection.cursor(dictionary=True)
+            
+            try:
+                cursor.execute(query, params)
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+
+    @staticmethod
+    def search_by_nombre_prefix(prefix: str, limit: int) -> List[Dict]:
+        """
+        Nombres que empiezan con prefix; LIKE 'prefijo%' recorre un rango del
+        índice único de nombre_estudiante
+        """
+        pattern = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        return StudentModel._fetch_search(
+            f"SELECT {', '.join(StudentModel.FIELDS)} FROM students "
+            "WHERE nombre_estudiante LIKE %s ORDER BY nombre_estudiante LIMIT %s",
+            (pattern, limit)
+        )
+
+    @staticmethod
+    def search_by_nombre_text(text: str, limit: int) -> List[Dict]:
+        """
+        Nombres que contienen text en cualquier posición, por el índice FULLTEXT
+        con parser ngram (la frase entre comillas exige los n-gramas contiguos),
+        ordenados por relevancia
+        """
+        phrase = '"' + text.replace('"', ' ') + '"'
+        return StudentModel._fetch_search(
+            f"SELECT {', '.join(StudentModel.FIELDS)}, "
+            "MATCH(nombre_estudiante) AGAINST (%s IN BOOLEAN MODE) AS score FROM students "
+            "WHERE MATCH(nombre_estudiante) AGAINST (%s IN BOOLEAN MODE) "
+            "ORDER BY score DESC, id DESC LIMIT %s",
+            (phrase, phrase, limit)
+        )
+
+    @staticmethod
+    def search_by_nue_prefix(prefix: str, limit: int) -> List[Dict]:
+        """
+        NUEs cuya representación decimal empieza con prefix. Como nue es
+        numérico, el prefijo se traduce a un rango por cada cantidad de dígitos
+        (123 -> 123, 1230..1239, 12300..12399, ...) que se resuelven con el
+        índice único de nue.
+        """
+        if not (prefix.isascii() and prefix.isdigit()) or (prefix.startswith('0') and prefix != '0'):
+            return []
+        base = int(prefix)
+        ranges = []
+        width = 1
+        while base * width <= StudentModel.NUE_MAX:
+            ranges.append((base * width, min(base * width + width - 1, StudentModel.NUE_MAX)))
+            if base == 0:
+                break
+            width *= 10
+        if not ranges:
+            # Prefijo mayor que cualquier nue posible
+            return []
+        conditions = ' OR '.join(['nue BETWEEN %s AND %s'] * len(ranges))
+        params = tuple(value for bounds in ranges for value in bounds)
+        return StudentModel._fetch_search(
+            f"SELECT {', '.join(StudentModel.FIELDS)} FROM students "
+            f"WHERE {conditions} ORDER BY nue LIMIT %s",
+            params + (limit,)
+        )
+
+    @staticmethod
+    def get_student_by_nombre(nombre_estudiante):
+        with db.connection() as connection:
+            cursor = connection.cursor(dictionary=True)
+            
+            try:
+                cursor.execute("SELECT * FROM students WHERE nombre_estudiante = %s", 
+                              (nombre_estudiante,))
+                return cursor.fetchone()
+            finally:
+                cursor.close()
 
     @staticmethod
     def get_student_by_nue(nue):
-        connection = db.get_connection()
-        cursor = connection.cursor(dictionary=True)
+        with db.connection() as connection:
+            cursor = connection.cursor(dictionary=True)
+            
+            try:
+                cursor.execute("SELECT * FROM students WHERE nue = %s", (nue,))
+                return cursor.fetchone()
+            finally:
+                cursor.close()
+
+    @staticmethod
+    def _to_decimal(value) -> Decimal:
+        # MySQL redondea el literal enviado a DECIMAL(5,2) con redondeo hacia arriba en .5
+        return Decimal(repr(value) if isinstance(value, float) else str(value)).quantize(
+            Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+    @staticmethod
+    def _apply_statistics(cursor, students: List[Dict], sign: int = 1) -> None:
+        """
+        Suma al resumen student_stats los estudiantes insertados en la
+        transacción actual (conteo, suma y conteo de promedio_actual por
+        graduado y anio_inicio); con sign=-1 resta los valores anteriores
+        de filas actualizadas
+        """
+        deltas = {}
+        for student in students:
+            graduado = student['graduado']
+            key = (-1 if graduado is None else int(bool(graduado)), student['anio_inicio'])
+            delta = deltas.setdefault(key, [0, Decimal('0'), 0])
+            delta[0] += 1
+            if student['promedio_actual'] is not None:
+                delta[1] += StudentModel._to_decimal(student['promedio_actual'])
+                delta[2] += 1
         
-        try:
-            cursor.execute("SELECT * FROM students WHERE nue = %s", (nue,))
-            return cursor.fetchone()
-        finally:
-            cursor.close()
+        # Orden fijo de llaves para evitar bloqueos cruzados entre importaciones
+        cursor.executemany(
+            """INSERT INTO student_stats
+                   (graduado, anio_inicio, student_count, promedio_sum, promedio_count)
+               VALUES (%s, %s, %s, %s, %s)
+               ON DUPLICATE KEY UPDATE
+                   student_count = student_count + VALUES(student_count),
+                   promedio_sum = promedio_sum + VALUES(promedio_sum),
+                   promedio_count = promedio_count + VALUES(promedio_count)""",
+            [(g, anio, sign * count, sign * total, sign * promedios)
+             for (g, anio), (count, total, promedios) in sorted(deltas.items())]
+        )
+
+    @staticmethod
+    def rebuild_statistics() -> None:
+        """
+        Recalcula student_stats desde cero a partir de la tabla students
+        """
+        with db.connection() as connection:
+            cursor = connection.cursor()
+            
+            try:
+                cursor.execute("DELETE FROM student_stats")
+                cursor.execute("""
+                    INSERT INTO student_stats
+                        (graduado, anio_inicio, student_count, promedio_sum, promedio_count)
+                    SELECT
+                        COALESCE(graduado, -1),
+                        anio_inicio,
+                        COUNT(*),
+                        COALESCE(SUM(promedio_actual), 0),
+                        COUNT(promedio_actual)
+                    FROM students
+                    GROUP BY COALESCE(graduado, -1), anio_inicio
+                """)
+                connection.commit()
+            except Exception as e:
+                connection.rollback()
+                raise e
+            finally:
+                cursor.close()
 
     @staticmethod
     def get_students_statistics():
-        connection = db.get_connection()
-        cursor = connection.cursor(dictionary=True)
+        """
+        Estadísticas del dashboard leídas del resumen student_stats, que tiene
+        una fila por (graduado, anio_inicio) y no crece con la tabla students
+        """
+        with db_read.connection() as connection:
+            cursor = connection.cursor(dictionary=True)
+            
+            try:
+                cursor.execute("""
+                    SELECT graduado, anio_inicio, student_count, promedio_sum, promedio_count
+                    FROM student_stats
+                    WHERE student_count > 0
+                """)
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
         
-        try:
-            stats = {}
-            
-            # Total de estudiantes
-            cursor.execute("SELECT COUNT(*) as total FROM students")
-            stats['total'] = cursor.fetchone()['total']
-            
-            # Estudiantes activos
-            cursor.execute("SELECT COUNT(*) as active FROM students WHERE graduado = 0")
-            stats['active'] = cursor.fetchone()['active']
-            
-            # Estudiantes graduados
-            cursor.execute("SELECT COUNT(*) as graduated FROM students WHERE graduado = 1")
-            stats['graduated'] = cursor.fetchone()['graduated']
-            
-            # Promedio por estado de graduación
-            cursor.execute("""
-                SELECT 
-                    graduado,
-                    AVG(promedio_actual) as avg_promedio
-                FROM students 
-                WHERE promedio_actual IS NOT NULL
-                GROUP BY graduado
-            """)
-            stats['avg_by_status'] = cursor.fetchall()
-            
-            # Estudiantes por año
-            cursor.execute("""
-                SELECT 
-                    anio_inicio,
-                    COUNT(*) as count
-                FROM students
-                GROUP BY anio_inicio
-                ORDER BY anio_inicio DESC
-            """)
-            stats['by_year'] = cursor.fetchall()
-            
-            return stats
-        finally:
-            cursor.close()
-
+        stats = {'total': 0, 'active': 0, 'graduated': 0}
+        by_status = {}
+        by_year = {}
+        for row in rows:
+            count = row['student_count']
+            graduado = None if row['graduado'] == -1 else row['graduado']
+            stats['total'] += count
+            if graduado == 0:
+                stats['active'] += count
+            elif graduado == 1:
+                stats['graduated'] += count
+            by_year[row['anio_inicio']] = by_year.get(row['anio_inicio'], 0) + count
+            if row['promedio_count']:
+                status = by_status.setdefault(graduado, [Decimal('0'), 0])
+                status[0] += row['promedio_sum']
+                status[1] += row['promedio_count']
+        
+        # AVG de un DECIMAL(5,2) en MySQL devuelve 6 decimales
+        stats['avg_by_status'] = [
+            {'graduado': graduado,
+             'avg_promedio': (total / count).quantize(Decimal('0.000001'), rounding=ROUND_HALF_UP)}
+            for graduado, (total, count) in sorted(by_status.items(), key=lambda item: (item[0] is not None, item[0]))
+        ]
+        stats['by_year'] = [
+            {'anio_inicio': anio, 'count': count}
+            for anio, count in sorted(by_year.items(), reverse=True)
+        ]
+        
+        return stats
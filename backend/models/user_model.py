@@ -1,50 +1,86 @@
 from database.connection import db
-import bcrypt
+from services.password_hasher import password_hasher
+from services.cache import user_cache
+from config import Config
 
 class UserModel:
     @staticmethod
     def create_user(email, password):
-        connection = db.get_connection()
-        cursor = connection.cursor()
+        hashed_password = password_hasher.hash(password)
         
-        hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
-        
-        try:
-            cursor.execute(
-                "INSERT INTO users (email, password) VALUES (%s, %s)",
-                (email, hashed_password.decode('utf-8'))
-            )
-            connection.commit()
-            return cursor.lastrowid
-        except Exception as e:
-            connection.rollback()
-            raise e
-        finally:
-            cursor.close()
+        with db.connection() as connection:
+            cursor = connection.cursor()
+            
+            try:
+                cursor.execute(
+                    "INSERT INTO users (email, password) VALUES (%s, %s)",
+                    (email, hashed_password)
+                )
+                connection.commit()
+                user_cache.delete(cursor.lastrowid)
+                return cursor.lastrowid
+            except Exception as e:
+                connection.rollback()
+                raise e
+            finally:
+                cursor.close()
 
     @staticmethod
     def get_user_by_email(email):
-        connection = db.get_connection()
-        cursor = connection.cursor(dictionary=True)
-        
-        try:
-            cursor.execute("SELECT * FROM users WHERE email = %s", (email,))
-            return cursor.fetchone()
-        finally:
-            cursor.close()
+        with db.connection() as connection:
+            cursor = connection.cursor(dictionary=True)
+            
+            try:
+                cursor.execute("SELECT * FROM users WHERE email = %s", (email,))
+                return cursor.fetchone()
+            finally:
+                cursor.close()
 
     @staticmethod
     def verify_password(hashed_password, password):
-        return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+        return password_hasher.verify(hashed_password, password)
+
+    @staticmethod
+    def needs_rehash(hashed_password):
+        return password_hasher.needs_rehash(hashed_password)
+
+    @staticmethod
+    def update_password(user_id, password):
+        hashed_password = password_hasher.hash(password)
+        
+        with db.connection() as connection:
+            cursor = connection.cursor()
+            
+            try:
+                cursor.execute(
+                    "UPDATE users SET password = %s WHERE id = %s",
+                    (hashed_password, user_id)
+                )
+                connection.commit()
+                user_cache.delete(user_id)
+            except Exception as e:
+                connection.rollback()
+                raise e
+            finally:
+                cursor.close()
 
     @staticmethod
     def get_user_by_id(user_id):
-        connection = db.get_connection()
-        cursor = connection.cursor(dictionary=True)
+        # Caché LRU/TTL por id; solo se guardan usuarios encontrados
+        cached = user_cache.get(user_id)
+        if cached is not None:
+            return dict(cached)
+        
+        with db.connection() as connection:
+            cursor = connection.cursor(dictionary=True)
+            
+            try:
+                cursor.execute("SELECT id, email FROM users WHERE id = %s", (user_id,))
+                user = cursor.fetchone()
+            finally:
+                cursor.close()
         
-        try:
-            cursor.execute("SELECT id, email FROM users WHERE id = %s", (user_id,))
-            return cursor.fetchone()
-        finally:
-            cursor.close()
+        if user:
+            user_cache.set(user_id, dict(user), Config.USER_CACHE_TTL)
+        return user
 
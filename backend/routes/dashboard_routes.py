@@ -1,18 +1,22 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 from models.student_model import StudentModel
+from controllers.student_controller import StudentController
+from services.cache import response_cache
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
 @dashboard_bp.route('/statistics', methods=['GET'])
 @jwt_required()
+@response_cache.cached('statistics')
 def get_statistics():
     stats = StudentModel.get_students_statistics()
     return jsonify(stats), 200
 
 @dashboard_bp.route('/students', methods=['GET'])
 @jwt_required()
+@response_cache.cached('students')
 def get_all_students():
-    students = StudentModel.get_all_students()
-    return jsonify(students), 200
+    result, status_code = StudentController.list_students(request.args)
+    return jsonify(result), status_code
 
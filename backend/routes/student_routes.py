@@ -1,90 +1,205 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required
+from flask import Blueprint, Response, request, jsonify, send_file
+from flask_jwt_extended import jwt_required, get_jwt_identity
 from controllers.student_controller import StudentController
-from models.student_model import StudentModel
+from services.import_jobs import import_jobs
+from services.cache import response_cache
+from services.error_reports import error_reports
+from config import Config
+import hashlib
 import os
-import time
+import tempfile
+import zipfile
 from werkzeug.utils import secure_filename
 
 student_bp = Blueprint('students', __name__)
 
-UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'xlsx', 'xls', 'csv'}
-
-if not os.path.exists(UPLOAD_FOLDER):
-    os.makedirs(UPLOAD_FOLDER)
+EXPORT_MIMETYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def is_zip(filename):
+    return filename.lower().endswith('.zip')
+
+def spool_upload(stream, limit=None):
+    """
+    Copia stream a un archivo temporal en memoria (pasa a disco si supera
+    UPLOAD_SPOOL_MAX_MB) y devuelve (archivo, tamaño, sha256 del contenido),
+    calculando la huella mientras se copia. Lanza ValueError si se copian más
+    de limit bytes, aunque el tamaño declarado en el .zip sea menor.
+    """
+    upload = tempfile.SpooledTemporaryFile(max_size=int(Config.UPLOAD_SPOOL_MAX_MB * 1024 * 1024))
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        data = stream.read(1024 * 1024)
+        if not data:
+            break
+        size += len(data)
+        if limit is not None and size > limit:
+            upload.close()
+            raise ValueError(f'El lote supera el límite de {Config.BATCH_MAX_MB:g} MB')
+        digest.update(data)
+        upload.write(data)
+    upload.seek(0)
+    return upload, size, digest.hexdigest()
+
+def zip_members(stream):
+    """
+    (archivo, nombre) de cada planilla del .zip; se ignoran carpetas, archivos
+    ocultos y los de otros tipos
+    """
+    try:
+        archive = zipfile.ZipFile(stream)
+    except zipfile.BadZipFile:
+        raise ValueError('El archivo .zip no es válido')
+    with archive:
+        for info in archive.infolist():
+            name = os.path.basename(info.filename)
+            if info.is_dir() or name.startswith('.') or info.filename.startswith('__MACOSX/') or not allowed_file(name):
+                continue
+            with archive.open(info) as member:
+                yield member, name
+
+def collect_batch(files):
+    """
+    Copia los archivos del lote (expandiendo los .zip) y devuelve una lista
+    de (archivo, nombre) y la huella del lote (nombres y contenido en orden).
+    Lanza ValueError si el lote excede BATCH_MAX_FILES o BATCH_MAX_MB.
+    """
+    remaining = int(Config.BATCH_MAX_MB * 1024 * 1024)
+    uploads = []
+    fingerprint = hashlib.sha256()
+    try:
+        for file in files:
+            members = zip_members(file.stream) if is_zip(file.filename) else [(file.stream, file.filename)]
+            for stream, name in members:
+                if len(uploads) >= Config.BATCH_MAX_FILES:
+                    raise ValueError(f'El lote no puede tener más de {Config.BATCH_MAX_FILES} archivos')
+                upload, size, digest = spool_upload(stream, remaining)
+                remaining -= size
+                uploads.append((upload, secure_filename(name)))
+                fingerprint.update(f'{secure_filename(name)}:{digest}\n'.encode('utf-8'))
+    except Exception:
+        for upload, _ in uploads:
+            upload.close()
+        raise
+    if not uploads:
+        raise ValueError('El archivo .zip no contiene archivos .xlsx, .xls o .csv')
+    return uploads, fingerprint.hexdigest()
+
 @student_bp.route('/upload', methods=['POST'])
 @jwt_required()
 def upload_students():
-    if 'file' not in request.files:
+    files = request.files.getlist('file')
+    if not files:
         return jsonify({'error': 'No se proporcionó ningún archivo'}), 400
     
-    file = request.files['file']
-    
-    if file.filename == '':
+    if any(file.filename == '' for file in files):
         return jsonify({'error': 'No se seleccionó ningún archivo'}), 400
     
+    # Varios archivos o un .zip se importan como un solo lote
+    if len(files) > 1 or is_zip(files[0].filename):
+        return upload_batch(files)
+    
+    file = files[0]
     if not allowed_file(file.filename):
         return jsonify({'error': 'Tipo de archivo no permitido. Use .xlsx, .xls o .csv'}), 400
     
+    # El archivo se copia a un buffer en memoria que pasa a un archivo temporal
+    # anónimo (nombre único, se borra al cerrarse) solo si supera el umbral; la
+    # huella permite responder sin reprocesar si el mismo archivo se sube otra vez
     filename = secure_filename(file.filename)
-    file_path = os.path.join(UPLOAD_FOLDER, filename)
-    file.save(file_path)
+    upload, size, digest = spool_upload(file.stream)
+    
+    # mode=upsert actualiza por NUE los estudiantes existentes que cambiaron.
+    # Archivos grandes (o mode=stream) se procesan por bloques con memoria acotada
+    mode = request.form.get('mode')
+    upsert = mode == 'upsert'
+    stream = not upsert and (mode == 'stream' or size >= Config.STREAM_THRESHOLD_MB * 1024 * 1024)
+    
+    job = import_jobs.submit(upload, filename, user_id=get_jwt_identity(), stream=stream, upsert=upsert,
+                             fingerprint=f'{filename.rsplit(".", 1)[-1].lower()}:{digest}')
+    return jsonify({
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': f'/api/students/jobs/{job.id}'
+    }), 202
+
+def upload_batch(files):
+    if request.form.get('mode') == 'upsert':
+        return jsonify({'error': 'El modo upsert solo está disponible para un archivo'}), 400
+    
+    if not all(allowed_file(file.filename) or is_zip(file.filename) for file in files):
+        return jsonify({'error': 'Tipo de archivo no permitido. Use .xlsx, .xls, .csv o .zip'}), 400
     
     try:
-        # Validar archivo
-        valid_students, errors = StudentController.validate_excel_file(file_path)
-        
-        if errors:
-            os.remove(file_path)
-            return jsonify({
-                'valid': False,
-                'errors': errors,
-                'valid_count': len(valid_students)
-            }), 400
-        
-        if not valid_students:
-            os.remove(file_path)
-            return jsonify({
-                'valid': False,
-                'errors': [{'row': 0, 'field': 'file', 'value': '', 'message': 'No hay estudiantes válidos en el archivo'}],
-                'valid_count': 0
-            }), 400
-        
-        # Tiempo mínimo de espera (simular procesamiento)
-        time.sleep(1)
-        
-        # Insertar estudiantes
-        result = StudentController.insert_students(valid_students)
-        
-        os.remove(file_path)
-        
-        if result['errors']:
-            return jsonify({
-                'success': True,
-                'inserted': result['inserted'],
-                'errors': result['errors'],
-                'message': f'Se insertaron {result["inserted"]} estudiantes con algunos errores'
-            }), 200
-        
-        return jsonify({
-            'success': True,
-            'inserted': result['inserted'],
-            'message': f'Se insertaron {result["inserted"]} estudiantes exitosamente'
-        }), 200
-        
-    except Exception as e:
-        if os.path.exists(file_path):
-            os.remove(file_path)
-        return jsonify({'error': f'Error al procesar el archivo: {str(e)}'}), 500
+        uploads, fingerprint = collect_batch(files)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except (zipfile.BadZipFile, RuntimeError, NotImplementedError) as e:
+        # Miembro dañado, cifrado o con un método de compresión no soportado
+        return jsonify({'error': f'No se pudo leer el archivo .zip: {str(e)}'}), 400
+    
+    job = import_jobs.submit_batch(uploads, user_id=get_jwt_identity(), fingerprint=fingerprint)
+    return jsonify({
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': f'/api/students/jobs/{job.id}',
+        'files': [name for _, name in uploads]
+    }), 202
+
+@student_bp.route('/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def get_import_job(job_id):
+    job = import_jobs.get(job_id)
+    
+    if not job or job.user_id != get_jwt_identity():
+        return jsonify({'error': 'Trabajo de importación no encontrado'}), 404
+    
+    return jsonify(job.to_dict()), 200
+
+@student_bp.route('/search', methods=['GET'])
+@jwt_required()
+@response_cache.cached('search')
+def search_students():
+    result, status_code = StudentController.search_students(request.args)
+    return jsonify(result), status_code
+
+@student_bp.route('/reports/<report_id>', methods=['GET'])
+@jwt_required()
+def download_error_report(report_id):
+    path = error_reports.get(report_id, owner=get_jwt_identity())
+    
+    if not path:
+        return jsonify({'error': 'Reporte de errores no encontrado'}), 404
+    
+    return send_file(path, mimetype='text/csv', as_attachment=True,
+                     download_name=f'errores_{report_id}.csv')
+
+@student_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_students():
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in EXPORT_MIMETYPES:
+        return jsonify({'error': 'Formato no soportado. Use ndjson o csv'}), 400
+    
+    compress = request.args.get('gzip', '').lower() in ('1', 'true')
+    headers = {'Content-Disposition': f'attachment; filename=students.{export_format}'}
+    if compress:
+        headers['Content-Encoding'] = 'gzip'
+    
+    return Response(
+        StudentController.export_students(export_format, compress),
+        mimetype=EXPORT_MIMETYPES[export_format],
+        headers=headers
+    )
 
 @student_bp.route('/', methods=['GET'])
 @jwt_required()
+@response_cache.cached('students')
 def get_students():
-    students = StudentModel.get_all_students()
-    return jsonify(students), 200
+    result, status_code = StudentController.list_students(request.args)
+    return jsonify(result), status_code
 
@@ -0,0 +1,148 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Any, Optional
+from flask import request, make_response
+from config import Config
+
+class CacheBackend:
+    """
+    Interfaz de almacenamiento de la caché; otro backend (p. ej. compartido
+    entre procesos) solo necesita implementar get, set, delete y clear
+    """
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+class NullCache(CacheBackend):
+    """Backend que no guarda nada (caché deshabilitada)"""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl):
+        pass
+
+    def delete(self, key):
+        pass
+
+    def clear(self):
+        pass
+
+class LRUCache(CacheBackend):
+    """
+    Caché en proceso con expiración por TTL y desalojo LRU al superar max_entries
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
+
+class ResponseCache:
+    """
+    Caché de respuestas JSON indexada por una versión de datos. Cada
+    importación que inserta filas llama a bump(), lo que invalida todas las
+    entradas anteriores. Las respuestas llevan ETag y Last-Modified y se
+    responde 304 cuando el cliente ya tiene la versión vigente.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float = 30):
+        self.backend = backend
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.version = 0
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+
+    def bump(self) -> None:
+        with self._lock:
+            self.version += 1
+            self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+        self.backend.clear()
+
+    def cached(self, namespace: str):
+        """
+        Decorador para vistas GET que devuelven JSON; solo se guardan las respuestas 200
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                version, last_modified = self.version, self.last_modified
+                key = f'{namespace}:{version}:{request.full_path}'
+                entry = self.backend.get(key)
+
+                if entry is None:
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    body = response.get_data()
+                    entry = (body, response.mimetype, hashlib.sha1(body).hexdigest())
+                    self.backend.set(key, entry, self.ttl)
+
+                body, mimetype, etag = entry
+                response = make_response(body)
+                response.mimetype = mimetype
+                response.set_etag(etag)
+                response.last_modified = last_modified
+                response.headers['Cache-Control'] = 'private, no-cache'
+                return response.make_conditional(request)
+            return wrapper
+        return decorator
+
+def _create_backend() -> CacheBackend:
+    if not Config.CACHE_ENABLED:
+        return NullCache()
+    return LRUCache(max_entries=Config.CACHE_MAX_ENTRIES)
+
+response_cache = ResponseCache(_create_backend(), ttl=Config.CACHE_TTL)
+
+# Registros de usuario por id para los endpoints autenticados con JWT
+user_cache = LRUCache(max_entries=Config.USER_CACHE_MAX_ENTRIES)
+
+# Resultados de importaciones recientes por huella del archivo subido
+upload_results = LRUCache(max_entries=Config.UPLOAD_DEDUP_MAX_ENTRIES)
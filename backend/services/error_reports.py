@@ -0,0 +1,86 @@
+import csv
+import os
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from config import Config
+
+# Tipo de error según el texto del mensaje, para agrupar los conteos
+ERROR_TYPES = [
+    ('ya existe', 'duplicado'),
+    ('es requerido', 'requerido'),
+    ('no puede ser mayor', 'fuera_de_rango'),
+    ('número válido', 'invalido'),
+    ('deben ser iguales', 'promedios_distintos'),
+    ('Columnas faltantes', 'columnas_faltantes'),
+    ('Error al leer', 'archivo_invalido'),
+]
+
+def error_type(error: Dict) -> str:
+    if 'student' in error:
+        return 'insercion'
+    message = str(error.get('message', ''))
+    for fragment, name in ERROR_TYPES:
+        if fragment in message:
+            return name
+    return 'otro'
+
+def summarize_errors(errors: List[Dict]) -> List[Dict]:
+    """
+    Conteo de errores por campo y tipo, de mayor a menor
+    """
+    counts = {}
+    for error in errors:
+        key = (error.get('field', 'insert'), error_type(error))
+        counts[key] = counts.get(key, 0) + 1
+    return [{'field': field, 'type': kind, 'count': count}
+            for (field, kind), count in sorted(counts.items(), key=lambda item: (-item[1], item[0]))]
+
+class ErrorReportStore:
+    """
+    Guarda la lista completa de errores de una importación como CSV
+    (fila, campo, valor, mensaje) para descargarla por id. Conserva los
+    últimos max_reports y borra los más antiguos.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_reports: int = 50):
+        self.directory = directory or os.path.join(tempfile.gettempdir(), 'student_error_reports')
+        self.max_reports = max_reports
+        self._reports = OrderedDict()  # id -> (ruta, dueño)
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def save(self, errors: List[Dict], owner: Optional[str] = None) -> str:
+        report_id = uuid.uuid4().hex
+        path = os.path.join(self.directory, f'{report_id}.csv')
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['row', 'field', 'value', 'message'])
+            for error in errors:
+                if 'student' in error:
+                    # Errores de inserción: {'student', 'error'}
+                    writer.writerow(['', 'insert', error['student'], error['error']])
+                else:
+                    writer.writerow([error['row'], error['field'], error['value'], error['message']])
+
+        with self._lock:
+            self._reports[report_id] = (path, owner)
+            while len(self._reports) > self.max_reports:
+                _, (old_path, _) = self._reports.popitem(last=False)
+                if os.path.exists(old_path):
+                    os.remove(old_path)
+        return report_id
+
+    def get(self, report_id: str, owner: Optional[str] = None) -> Optional[str]:
+        """
+        Ruta del reporte si existe y pertenece a owner
+        """
+        with self._lock:
+            report = self._reports.get(report_id)
+        if report is None or report[1] != owner or not os.path.exists(report[0]):
+            return None
+        return report[0]
+
+error_reports = ErrorReportStore(max_reports=Config.ERROR_REPORTS_RETAINED)
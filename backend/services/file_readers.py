@@ -0,0 +1,115 @@
+"""
+Lectores de los archivos subidos.
+
+Cada formato tiene una lista de lectores en orden de preferencia; se usa el
+primero cuyo motor esté instalado (o el indicado en Config.UPLOAD_READER_ENGINES,
+p. ej. "csv=c,xlsx=openpyxl"). Todos leen solo las columnas indicadas y aplican
+los dtypes explícitos de las columnas de texto; las columnas numéricas se
+infieren porque los valores inválidos deben llegar tal cual a la validación.
+"""
+import csv
+import importlib.util
+import io
+import re
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
+import pandas as pd
+from config import Config
+
+class FileReader:
+    """
+    Lector de un formato con un motor de pandas. requires son los módulos
+    que deben estar instalados y min_pandas la versión mínima de pandas que
+    soporta el motor.
+    """
+
+    def __init__(self, engine: str, requires: Tuple[str, ...] = (), min_pandas: Tuple[int, int] = (0, 0)):
+        self.engine = engine
+        self.requires = requires
+        self.min_pandas = min_pandas
+
+    def available(self) -> bool:
+        version = tuple(int(re.match(r'\d*', part).group() or 0) for part in pd.__version__.split('.')[:2])
+        return (version >= self.min_pandas
+                and all(importlib.util.find_spec(module) is not None for module in self.requires))
+
+    def read(self, source, columns: List[str], dtypes: Dict[str, type]) -> pd.DataFrame:
+        raise NotImplementedError
+
+class CsvReader(FileReader):
+    def read(self, source, columns, dtypes):
+        # usecols y dtype solo con las columnas presentes: el motor pyarrow
+        # falla si se le pide una columna que no existe
+        present = [column for column in _csv_header(source) if column in columns]
+        # El conversor por defecto del motor c no es exacto ("7.3100000000000005"
+        # llega como 7.31); round_trip lee el mismo valor que pyarrow
+        options = {'float_precision': 'round_trip'} if self.engine == 'c' else {}
+        return pd.read_csv(source, engine=self.engine, usecols=present,
+                           dtype={name: dtype for name, dtype in dtypes.items() if name in present},
+                           **options)
+
+class ExcelReader(FileReader):
+    def read(self, source, columns, dtypes):
+        return pd.read_excel(source, engine=self.engine, usecols=lambda name: name in columns,
+                             dtype=dtypes)
+
+READERS = {
+    'csv': [
+        CsvReader('pyarrow', requires=('pyarrow',)),
+        CsvReader('c')
+    ],
+    'xlsx': [
+        ExcelReader('calamine', requires=('python_calamine',), min_pandas=(2, 2)),
+        ExcelReader('openpyxl', requires=('openpyxl',))
+    ],
+    'xls': [
+        ExcelReader('calamine', requires=('python_calamine',), min_pandas=(2, 2)),
+        ExcelReader('xlrd', requires=('xlrd',))
+    ]
+}
+
+def _configured_engines() -> Dict[str, str]:
+    engines = {}
+    for item in Config.UPLOAD_READER_ENGINES.split(','):
+        if '=' in item:
+            file_format, engine = item.split('=', 1)
+            engines[file_format.strip().lower()] = engine.strip()
+    return engines
+
+def select_reader(file_format: str) -> FileReader:
+    """
+    Lector configurado para el formato, o el más rápido disponible
+    """
+    readers = READERS.get(file_format, READERS['xlsx'])
+    engine = _configured_engines().get(file_format)
+    if engine:
+        for reader in readers:
+            if reader.engine == engine:
+                return reader
+        raise ValueError(f'Motor de lectura desconocido para {file_format}: {engine}')
+    for reader in readers:
+        if reader.available():
+            return reader
+    # Sin motor instalado se usa el último para que pandas informe qué falta
+    return readers[-1]
+
+def read_upload(source: Union[str, BinaryIO], file_format: str, columns: List[str],
+                dtypes: Optional[Dict[str, type]] = None) -> Tuple[pd.DataFrame, str]:
+    """
+    Lee el archivo completo y devuelve (DataFrame, motor usado)
+    """
+    reader = select_reader(file_format)
+    return reader.read(source, columns, dtypes or {}), reader.engine
+
+def _csv_header(source: Union[str, BinaryIO]) -> List[str]:
+    """
+    Nombres de columna de la primera línea del CSV; un archivo abierto
+    vuelve a su posición inicial
+    """
+    if isinstance(source, str):
+        with open(source, 'r', encoding='utf-8-sig', newline='') as f:
+            line = f.readline()
+    else:
+        position = source.tell()
+        line = source.readline().decode('utf-8-sig')
+        source.seek(position)
+    return next(csv.reader(io.StringIO(line)), [])
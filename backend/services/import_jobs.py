@@ -0,0 +1,210 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Dict, List, Optional, Tuple
+from config import Config
+from controllers.student_controller import StudentController
+from services.cache import CacheBackend, NullCache, response_cache, upload_results
+from services.metrics import observe_import
+
+class ImportJob:
+    """
+    Estado y progreso de una importación en segundo plano
+    """
+    PHASES = ('parse', 'validate', 'insert')
+
+    def __init__(self, filename: str, user_id: Optional[str] = None):
+        self.id = uuid.uuid4().hex
+        self.filename = filename
+        self.user_id = user_id
+        self.status = 'queued'
+        self.rows_parsed = 0
+        self.rows_validated = 0
+        self.rows_inserted = 0
+        self.error_count = 0
+        self.reader = None
+        # Segundos acumulados por fase (en modo streaming, la suma de los bloques)
+        self.parse_seconds = 0.0
+        self.validate_seconds = 0.0
+        self.insert_seconds = 0.0
+        self.result = None
+        self.status_code = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def add(self, **counters):
+        with self._lock:
+            for name, value in counters.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ('completed', 'failed')
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            elapsed = None
+            if self.started_at:
+                elapsed = (self.finished_at or time.time()) - self.started_at
+            data = {
+                'job_id': self.id,
+                'filename': self.filename,
+                'status': self.status,
+                'rows_parsed': self.rows_parsed,
+                'rows_validated': self.rows_validated,
+                'rows_inserted': self.rows_inserted,
+                'error_count': self.error_count,
+                'reader': self.reader,
+                'phase_seconds': {phase: round(getattr(self, f'{phase}_seconds'), 3)
+                                  for phase in self.PHASES},
+                'elapsed_seconds': round(elapsed, 3) if elapsed is not None else None,
+                'rows_per_second': round(self.rows_validated / elapsed, 1) if elapsed else None,
+                'inserts_per_second': round(self.rows_inserted / elapsed, 1) if elapsed else None
+            }
+            if self.finished:
+                data['status_code'] = self.status_code
+                data['result'] = self.result
+            return data
+
+class ImportJobManager:
+    """
+    Ejecuta importaciones en un pool local de hilos y conserva los últimos
+    max_retained trabajos para consultar su progreso y resultado.
+
+    Con una huella (fingerprint) del archivo, un archivo idéntico del mismo
+    usuario no se vuelve a procesar: si hay un trabajo en curso se devuelve
+    ese trabajo, y si terminó hace poco se responde con el resultado guardado
+    en results mientras la versión de datos (response_cache.version) no cambie.
+    """
+
+    def __init__(self, max_workers: int = 2, max_retained: int = 100,
+                 results: Optional[CacheBackend] = None, results_ttl: float = 3600):
+        self.max_retained = max_retained
+        self.results = results or NullCache()
+        self.results_ttl = results_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='import')
+        self._jobs = OrderedDict()
+        self._active = {}  # huella -> trabajo en curso
+        self._lock = threading.Lock()
+
+    def submit(self, upload: BinaryIO, filename: str, user_id: Optional[str] = None,
+               stream: bool = False, upsert: bool = False,
+               fingerprint: Optional[str] = None) -> ImportJob:
+        """
+        Encola la importación de upload (archivo binario posicionado al inicio);
+        el trabajo se encarga de cerrarlo al terminar
+        """
+        job = ImportJob(filename, user_id)
+        key = self._result_key(fingerprint, user_id, 'upsert' if upsert else 'stream' if stream else 'insert')
+        return self._enqueue(job, [upload], key, lambda: StudentController.process_upload(
+            upload, stream=stream, progress=job, filename=job.filename, owner=job.user_id, upsert=upsert))
+
+    def submit_batch(self, files: List[Tuple[BinaryIO, str]], user_id: Optional[str] = None,
+                     fingerprint: Optional[str] = None) -> ImportJob:
+        """
+        Encola la importación de varios archivos (archivo binario, nombre) como
+        un solo lote; el trabajo cierra todos los archivos al terminar
+        """
+        job = ImportJob(', '.join(filename for _, filename in files), user_id)
+        key = self._result_key(fingerprint, user_id, 'batch')
+        return self._enqueue(job, [upload for upload, _ in files], key,
+                             lambda: StudentController.process_batch_upload(files, progress=job,
+                                                                            owner=job.user_id))
+
+    @staticmethod
+    def _result_key(fingerprint: Optional[str], user_id: Optional[str], mode: str) -> Optional[str]:
+        # Por usuario: el resultado puede incluir reportes de errores de su dueño
+        return f'{user_id}:{mode}:{fingerprint}' if fingerprint else None
+
+    def _enqueue(self, job: ImportJob, uploads: List[BinaryIO], key: Optional[str], process) -> ImportJob:
+        with self._lock:
+            if key:
+                running = self._active.get(key)
+                if running is not None:
+                    self._close(uploads)
+                    return running
+                cached = self.results.get(key)
+                if cached is not None and cached['version'] == response_cache.version:
+                    self._close(uploads)
+                    job.status = 'completed'
+                    job.started_at = job.finished_at = time.time()
+                    job.result, job.status_code = cached['result'], cached['status_code']
+                    self._jobs[job.id] = job
+                    self._evict()
+                    return job
+                self._active[key] = job
+            self._jobs[job.id] = job
+            self._evict()
+        self._executor.submit(self._execute, job, uploads, process, key)
+        return job
+
+    def get(self, job_id: str) -> Optional[ImportJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _evict(self):
+        # Descartar los trabajos terminados más antiguos
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.max_retained:
+                break
+            if self._jobs[job_id].finished:
+                del self._jobs[job_id]
+
+    def _execute(self, job: ImportJob, uploads: List[BinaryIO], process, key: Optional[str] = None):
+        job.status = 'running'
+        job.started_at = time.time()
+        version = response_cache.version
+        try:
+            result, status_code = process()
+            job.result, job.status_code = result, status_code
+            job.status = 'completed'
+            if key:
+                self._remember(key, job, version)
+        except Exception as e:
+            job.result = {'error': f'Error al procesar el archivo: {str(e)}'}
+            job.status_code = 500
+            job.status = 'failed'
+        finally:
+            job.finished_at = time.time()
+            if key:
+                with self._lock:
+                    self._active.pop(key, None)
+            self._close(uploads)
+            observe_import({phase: getattr(job, f'{phase}_seconds') for phase in job.PHASES},
+                           {'parsed': job.rows_parsed, 'validated': job.rows_validated,
+                            'inserted': job.rows_inserted, 'errors': job.error_count})
+
+    def _remember(self, key: str, job: ImportJob, version: int) -> None:
+        """
+        Guarda el resultado para repeticiones del mismo archivo. Un rechazo
+        (400, no se escribió nada) vale mientras los datos sigan en la versión
+        con la que se validó; una importación exitosa se registra con la versión
+        posterior a sus inserciones y se responde como "ya importado".
+        """
+        if job.status_code == 400:
+            self.results.set(key, {'version': version, 'status_code': 400,
+                                   'result': dict(job.result, cached=True)}, self.results_ttl)
+        elif job.status_code == 200:
+            self.results.set(key, {'version': response_cache.version, 'status_code': 200, 'result': {
+                'success': True,
+                'already_imported': True,
+                'inserted': 0,
+                'previous_job_id': job.id,
+                'message': 'Este archivo ya fue importado; no se realizaron cambios'
+            }}, self.results_ttl)
+
+    @staticmethod
+    def _close(uploads: List[BinaryIO]) -> None:
+        for upload in uploads:
+            upload.close()
+
+import_jobs = ImportJobManager(
+    max_workers=Config.IMPORT_WORKERS,
+    max_retained=Config.IMPORT_JOBS_RETAINED,
+    results=upload_results if Config.UPLOAD_DEDUP_ENABLED else None,
+    results_ttl=Config.UPLOAD_DEDUP_TTL
+)
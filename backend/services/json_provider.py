@@ -0,0 +1,77 @@
+"""
+Serialización JSON de la API.
+
+Con orjson instalado (Config.JSON_PROVIDER = 'orjson') las respuestas se
+serializan en C; sin él se usa el proveedor por defecto de Flask. El formato
+es el mismo en ambos casos: Decimal como texto con los decimales de la columna
+("8.50"), fechas en formato HTTP, claves ordenadas y salida compacta fuera de
+modo debug. Diferencias: orjson no escapa caracteres no ASCII y escribe los
+NaN como null (el módulo json escribe NaN, que no es JSON válido).
+"""
+import importlib.util
+import json
+from typing import Any
+from flask.json.provider import DefaultJSONProvider
+from config import Config
+
+orjson = None
+if importlib.util.find_spec('orjson') is not None:
+    import orjson
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Proveedor JSON de Flask respaldado por orjson. Los tipos que orjson no
+    conoce (Decimal, date, datetime) pasan por DefaultJSONProvider.default;
+    si se piden opciones del módulo json (p. ej. cls) o orjson no puede
+    serializar un valor (enteros de más de 64 bits) se usa el proveedor base.
+    """
+
+    def _options(self, indent: bool = False) -> int:
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        try:
+            return orjson.dumps(obj, default=self.default, option=self._options()).decode('utf-8')
+        except orjson.JSONEncodeError:
+            return super().dumps(obj)
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        try:
+            body = orjson.dumps(obj, default=self.default, option=self._options(indent))
+        except orjson.JSONEncodeError:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
+def init_app(app) -> None:
+    """
+    Instala el proveedor configurado; 'orjson' sin el paquete instalado
+    conserva el proveedor por defecto
+    """
+    if Config.JSON_PROVIDER == 'orjson' and orjson is not None:
+        app.json = OrjsonProvider(app)
+
+def dumps_bytes(obj: Any) -> bytes:
+    """
+    Serialización compacta para las exportaciones (fuera de una respuesta
+    de Flask); los valores que no son JSON se convierten con str
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(obj, default=str, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
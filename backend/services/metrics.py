@@ -0,0 +1,255 @@
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from flask import Response, g, request
+from config import Config
+
+# Límites (segundos) de los histogramas de latencia
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+slow_query_log = logging.getLogger('slow_query')
+
+def _format_labels(names: Tuple[str, ...], values: Tuple, extra: str = '') -> str:
+    parts = []
+    for name, value in zip(names, values):
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{name}="{value}"')
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+def _format_value(value) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> list:
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for values, total in sorted(self._values.items()):
+                lines.append(f'{self.name}{_format_labels(self.labels, values)} {_format_value(total)}')
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = tuple(buckets) + (float('inf'),)
+        self._series = {}  # etiquetas -> [conteos por límite, suma, total]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values) -> None:
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list:
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for values, (counts, total, count) in sorted(self._series.items()):
+                for bound, bucket_count in zip(self.buckets, counts):
+                    le = f'le="{_format_value(bound)}"'
+                    lines.append(f'{self.name}_bucket{_format_labels(self.labels, values, le)} {bucket_count}')
+                lines.append(f'{self.name}_sum{_format_labels(self.labels, values)} {_format_value(total)}')
+                lines.append(f'{self.name}_count{_format_labels(self.labels, values)} {count}')
+        return lines
+
+class MetricsRegistry:
+    """
+    Métricas en proceso expuestas en formato de texto de Prometheus
+    """
+
+    def __init__(self):
+        self.http_requests = Histogram(
+            'http_request_duration_seconds', 'Duración de las peticiones HTTP por ruta',
+            ('method', 'route', 'status'))
+        self.sql_queries = Histogram(
+            'db_query_duration_seconds', 'Duración de las sentencias SQL por operación',
+            ('operation',))
+        self.sql_rows = Counter(
+            'db_rows_returned_total', 'Filas leídas de los cursores por operación', ('operation',))
+        self.sql_slow = Counter(
+            'db_slow_queries_total', 'Sentencias SQL que superaron SLOW_QUERY_MS', ('operation',))
+        self.import_phases = Histogram(
+            'import_phase_duration_seconds', 'Duración de las fases de una importación',
+            ('phase',), buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600))
+        self.import_rows = Counter(
+            'import_rows_total', 'Filas procesadas por las importaciones por etapa', ('stage',))
+
+    def observe_query(self, statement, duration: float) -> None:
+        operation = _operation(statement)
+        self.sql_queries.observe(duration, operation)
+        threshold = Config.SLOW_QUERY_MS
+        if threshold and duration * 1000 >= threshold:
+            self.sql_slow.inc(operation)
+            sql = ' '.join(str(statement).split())
+            slow_query_log.warning('%.1f ms %s', duration * 1000, sql[:1000])
+
+    def render(self) -> str:
+        from database.connection import db, db_read
+
+        lines = []
+        for metric in (self.http_requests, self.sql_queries, self.sql_rows, self.sql_slow,
+                       self.import_phases, self.import_rows):
+            lines.extend(metric.render())
+
+        # El pool primario va sin etiqueta; el de la réplica (si existe) con pool="replica"
+        pools = [('', db.stats())]
+        if db_read.replica is not None:
+            pools.append(('{pool="replica"}', db_read.replica.stats()))
+        for metric, key, kind, help_text in (
+                ('db_pool_in_use', 'in_use', 'gauge', 'Conexiones entregadas'),
+                ('db_pool_idle', 'idle', 'gauge', 'Conexiones inactivas en el pool'),
+                ('db_pool_total', 'total', 'gauge', 'Conexiones abiertas'),
+                ('db_pool_checkouts_total', 'checkouts', 'counter', 'Conexiones entregadas desde el inicio'),
+                ('db_pool_waits_total', 'waits', 'counter', 'Entregas que tuvieron que esperar'),
+                ('db_pool_timeouts_total', 'timeouts', 'counter', 'Esperas que agotaron DB_POOL_TIMEOUT'),
+                ('db_pool_wait_seconds_total', 'wait_time_total', 'counter', 'Segundos esperando una conexión')):
+            lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} {kind}']
+            lines += [f'{metric}{labels} {_format_value(pool[key])}' for labels, pool in pools]
+        lines.extend(_cache_lines())
+        return '\n'.join(lines) + '\n'
+
+def _cache_lines() -> list:
+    """
+    Aciertos, fallos y tamaño de las cachés en proceso (las deshabilitadas no se reportan)
+    """
+    from services.cache import LRUCache, response_cache, upload_results, user_cache
+
+    caches = [(name, cache.stats()) for name, cache in (('response', response_cache.backend),
+                                                         ('user', user_cache),
+                                                         ('upload_results', upload_results))
+              if isinstance(cache, LRUCache)]
+    lines = []
+    for metric, key, kind, help_text in (
+            ('cache_hits_total', 'hits', 'counter', 'Lecturas de la caché que encontraron la entrada'),
+            ('cache_misses_total', 'misses', 'counter', 'Lecturas de la caché sin entrada vigente'),
+            ('cache_entries', 'size', 'gauge', 'Entradas guardadas en la caché')):
+        lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} {kind}']
+        lines += [f'{metric}{_format_labels(("cache",), (name,))} {_format_value(stats[key])}'
+                  for name, stats in caches]
+    return lines
+
+def _operation(statement) -> str:
+    words = str(statement).split(None, 1)
+    return words[0].upper() if words else 'UNKNOWN'
+
+class InstrumentedCursor:
+    """
+    Envoltura de un cursor de mysql.connector que mide cada sentencia y
+    cuenta las filas leídas; el resto de atributos se delegan al cursor
+    """
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._operation = 'UNKNOWN'
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def _timed(self, method, statement, *args, **kwargs):
+        self._operation = _operation(statement)
+        start = time.perf_counter()
+        try:
+            return method(statement, *args, **kwargs)
+        finally:
+            metrics.observe_query(statement, time.perf_counter() - start)
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        return self._timed(self._cursor.execute, operation, params, *args, **kwargs)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        return self._timed(self._cursor.executemany, operation, seq_params, *args, **kwargs)
+
+    def _count(self, rows):
+        metrics.sql_rows.inc(self._operation, amount=len(rows))
+        return rows
+
+    def fetchall(self):
+        return self._count(self._cursor.fetchall())
+
+    def fetchmany(self, size=1):
+        return self._count(self._cursor.fetchmany(size))
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            metrics.sql_rows.inc(self._operation)
+        return row
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+class InstrumentedConnection:
+    """
+    Envoltura de una conexión cuyos cursores quedan instrumentados
+    """
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._connection.cursor(*args, **kwargs))
+
+metrics = MetricsRegistry()
+
+def init_app(app) -> None:
+    """
+    Registra la medición de latencia por ruta y el endpoint /metrics
+    """
+
+    @app.before_request
+    def start_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        started: Optional[float] = g.pop('request_started', None)
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            metrics.http_requests.observe(time.perf_counter() - started,
+                                          request.method, route, response.status_code)
+        return response
+
+    @app.teardown_request
+    def record_failed_request(exc):
+        # after_request no se ejecuta si la vista lanza una excepción no manejada
+        started: Optional[float] = g.pop('request_started', None)
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            metrics.http_requests.observe(time.perf_counter() - started, request.method, route, 500)
+
+    @app.route('/metrics', methods=['GET'])
+    def prometheus_metrics():
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+def observe_import(job_phases: Dict[str, float], counters: Dict[str, int]) -> None:
+    for phase, seconds in job_phases.items():
+        metrics.import_phases.observe(seconds, phase)
+    for stage, count in counters.items():
+        if count:
+            metrics.import_rows.inc(stage, amount=count)
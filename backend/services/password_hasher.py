@@ -0,0 +1,63 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+import bcrypt
+from config import Config
+
+class HasherBusyError(Exception):
+    """El pool de hashing está saturado; la petición debe responder 503"""
+    pass
+
+class PasswordHasher:
+    """
+    Ejecuta bcrypt en un pool de hilos dedicado y acotado para que el trabajo
+    de CPU de los inicios de sesión no compita sin límite con el resto de
+    peticiones. Admite como máximo workers + max_pending operaciones a la vez;
+    las demás fallan de inmediato con HasherBusyError en lugar de encolarse, y
+    también una operación que no termina dentro de timeout segundos.
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 16, rounds: int = 12,
+                 timeout: float = 10):
+        self.rounds = rounds
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusyError('Demasiadas operaciones de contraseña en curso')
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FuturesTimeoutError:
+            # La operación sigue en el pool y libera su lugar al terminar
+            raise HasherBusyError(f'La operación de contraseña no terminó en {self.timeout:g} segundos')
+
+    def hash(self, password: str) -> str:
+        hashed = self._run(bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt(rounds=self.rounds))
+        return hashed.decode('utf-8')
+
+    def verify(self, hashed_password: str, password: str) -> bool:
+        return self._run(bcrypt.checkpw, password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """
+        True si el hash guardado usa un costo distinto al configurado ($2b$<costo>$...)
+        """
+        try:
+            return int(hashed_password.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return False
+
+password_hasher = PasswordHasher(
+    workers=Config.PASSWORD_HASH_WORKERS,
+    max_pending=Config.PASSWORD_HASH_MAX_PENDING,
+    rounds=Config.BCRYPT_ROUNDS,
+    timeout=Config.PASSWORD_HASH_TIMEOUT
+)
@@ -0,0 +1,57 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Iterable, List
+from config import Config
+
+class ValidationPool:
+    """
+    Pool de procesos para la validación de archivos grandes, creado al primer
+    uso. Usa 'spawn' porque el proceso principal tiene hilos (servidor y
+    trabajos de importación) y un fork podría copiar locks tomados.
+    """
+
+    def __init__(self, workers: int = 0, min_rows: int = 200000):
+        self.workers = workers or os.cpu_count() or 1
+        self.min_rows = min_rows
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def should_use(self, rows: int) -> bool:
+        return self.workers > 1 and rows >= self.min_rows
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+            return self._executor
+
+    def map(self, fn: Callable, items: Iterable) -> List:
+        """
+        Aplica fn a cada elemento en los procesos y devuelve los resultados en orden.
+        Si un proceso muere el pool se descarta (se recrea en el siguiente uso) y
+        se propaga BrokenProcessPool.
+        """
+        executor = self._get_executor()
+        try:
+            return list(executor.map(fn, items))
+        except BrokenProcessPool:
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+validation_pool = ValidationPool(
+    workers=Config.VALIDATION_WORKERS,
+    min_rows=Config.PARALLEL_VALIDATION_MIN_ROWS
+)
@@ -0,0 +1,46 @@
+import math
+import os
+import sys
+import numpy as np
+import pytest
+
+# Las pruebas importan los módulos de backend como lo hace app.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark import generate_roster
+from models.student_model import StudentModel
+
+# Nombres y NUEs que la base de datos simulada de stub_database ya tiene guardados
+EXISTING_NOMBRES = {'Luis', 'Eva', 'bench 7-5'}
+EXISTING_NUES = {3, 99, 1070000009}
+
+def find_existing(nombres, nues, batch_size=None):
+    return EXISTING_NOMBRES.intersection(nombres), EXISTING_NUES.intersection(nues)
+
+@pytest.fixture
+def stub_database(monkeypatch):
+    monkeypatch.setattr(StudentModel, 'find_existing_keys', staticmethod(find_existing))
+
+def _missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+def _same(a, b):
+    if _missing(a) or _missing(b):
+        return _missing(a) and _missing(b)
+    if isinstance(a, bool) or isinstance(b, bool):
+        return type(a) is type(b) and a == b
+    if isinstance(a, (int, float, np.number)) and isinstance(b, (int, float, np.number)):
+        return a == b
+    return type(a) is type(b) and a == b
+
+def assert_same_records(expected, actual):
+    assert len(expected) == len(actual)
+    for x, y in zip(expected, actual):
+        assert x.keys() == y.keys(), (x, y)
+        for key in x:
+            assert _same(x[key], y[key]), (key, x, y)
+
+@pytest.fixture
+def roster():
+    """Planilla sintética con errores y duplicados (benchmark.generate_roster)"""
+    return generate_roster(3000, error_rate=0.05, duplicate_ratio=0.2, seed=7)
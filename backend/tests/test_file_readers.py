@@ -0,0 +1,41 @@
+"""
+Los motores rápidos de lectura deben dar los mismos resultados de validación
+que los motores de referencia (c para CSV, openpyxl para Excel)
+"""
+import pytest
+
+from config import Config
+from controllers.student_controller import StudentController
+from services.file_readers import select_reader
+from tests.conftest import assert_same_records
+
+pytestmark = pytest.mark.usefixtures('stub_database')
+
+def _validate_with(monkeypatch, engines, path):
+    monkeypatch.setattr(Config, 'UPLOAD_READER_ENGINES', engines)
+    file_format, engine = engines.split('=')
+    assert select_reader(file_format).engine == engine
+    return StudentController.validate_excel_file(str(path), parallel=False)
+
+def test_pyarrow_csv_matches_c_engine(roster, tmp_path, monkeypatch):
+    pytest.importorskip('pyarrow')
+    path = tmp_path / 'roster.csv'
+    roster.to_csv(path, index=False)
+    
+    reference = _validate_with(monkeypatch, 'csv=c', path)
+    fast = _validate_with(monkeypatch, 'csv=pyarrow', path)
+    
+    assert_same_records(reference[0], fast[0])
+    assert_same_records(reference[1], fast[1])
+
+def test_calamine_xlsx_matches_openpyxl(roster, tmp_path, monkeypatch):
+    pytest.importorskip('python_calamine')
+    pytest.importorskip('openpyxl')
+    path = tmp_path / 'roster.xlsx'
+    roster.to_excel(path, index=False)
+    
+    reference = _validate_with(monkeypatch, 'xlsx=openpyxl', path)
+    fast = _validate_with(monkeypatch, 'xlsx=calamine', path)
+    
+    assert_same_records(reference[0], fast[0])
+    assert_same_records(reference[1], fast[1])
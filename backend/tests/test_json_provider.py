@@ -0,0 +1,33 @@
+"""
+El proveedor orjson vuelve al módulo json con los valores que orjson no
+puede serializar (enteros de más de 64 bits)
+"""
+import json
+from decimal import Decimal
+import pytest
+from flask import Flask
+
+from services import json_provider
+
+pytestmark = pytest.mark.skipif(json_provider.orjson is None, reason='orjson no está instalado')
+
+BIG = 10 ** 25
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.json = json_provider.OrjsonProvider(app)
+    return app
+
+def test_response_with_wide_int(app):
+    with app.app_context():
+        response = app.json.response({'value': BIG, 'promedio': Decimal('8.50')})
+    
+    assert response.status_code == 200
+    assert json.loads(response.get_data()) == {'value': BIG, 'promedio': '8.50'}
+
+def test_dumps_with_wide_int(app):
+    assert json.loads(app.json.dumps([BIG, 1])) == [BIG, 1]
+
+def test_dumps_bytes_with_wide_int():
+    assert json.loads(json_provider.dumps_bytes({'error': BIG})) == {'error': BIG}
@@ -0,0 +1,30 @@
+from flask import Flask
+
+from services import metrics as metrics_module
+from services.metrics import metrics
+
+def _count(route, status):
+    prefix = f'http_request_duration_seconds_count{{method="GET",route="{route}",status="{status}"}} '
+    for line in metrics.render().splitlines():
+        if line.startswith(prefix):
+            return int(line[len(prefix):])
+    return 0
+
+def test_unhandled_exceptions_are_recorded():
+    app = Flask(__name__)
+    metrics_module.init_app(app)
+    
+    @app.route('/boom')
+    def boom():
+        raise RuntimeError('boom')
+    
+    @app.route('/ok')
+    def ok():
+        return 'ok'
+    
+    client = app.test_client()
+    before_failed, before_ok = _count('/boom', 500), _count('/ok', 200)
+    assert client.get('/boom').status_code == 500
+    assert client.get('/ok').status_code == 200
+    assert _count('/boom', 500) == before_failed + 1
+    assert _count('/ok', 200) == before_ok + 1
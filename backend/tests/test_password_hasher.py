@@ -0,0 +1,9 @@
+import time
+import pytest
+
+from services.password_hasher import HasherBusyError, PasswordHasher
+
+def test_timeout_is_reported_as_busy():
+    hasher = PasswordHasher(workers=1, max_pending=1, timeout=0.05)
+    with pytest.raises(HasherBusyError):
+        hasher._run(time.sleep, 0.3)
@@ -0,0 +1,69 @@
+"""
+Validación de los parámetros de consulta del listado de estudiantes
+"""
+import io
+import pytest
+from werkzeug.datastructures import MultiDict
+
+from controllers.student_controller import StudentController
+from models.student_model import StudentModel
+
+@pytest.fixture
+def pages(monkeypatch):
+    calls = []
+    
+    def get_students_page(limit, after_id, filters, fields, as_tuples=False):
+        calls.append(filters)
+        return [], None
+    
+    monkeypatch.setattr(StudentModel, 'get_students_page', staticmethod(get_students_page))
+    return calls
+
+@pytest.mark.parametrize('value', ['inf', '-inf', 'nan', 'Infinity', 'x'])
+@pytest.mark.parametrize('name', ['promedio_min', 'promedio_max'])
+def test_list_students_rejects_non_finite_promedio(pages, name, value):
+    body, status = StudentController.list_students(MultiDict({name: value}))
+    
+    assert status == 400
+    assert pages == []
+
+def test_list_students_promedio_filters(pages):
+    body, status = StudentController.list_students(MultiDict({'promedio_min': '7.5', 'promedio_max': '9'}))
+    
+    assert status == 200
+    assert pages == [{'promedio_min': 7.5, 'promedio_max': 9.0}]
+
+@pytest.fixture
+def no_stored_students(monkeypatch):
+    monkeypatch.setattr(StudentModel, 'find_existing_keys',
+                        staticmethod(lambda nombres, nues, batch_size=None: (set(), set())))
+    monkeypatch.setattr(StudentModel, 'find_nues_by_nombre',
+                        staticmethod(lambda nombres, batch_size=None: {}))
+
+def _upload(content, upsert):
+    return StudentController.process_upload(io.BytesIO(content.encode('utf-8')),
+                                            filename='estudiantes.csv', upsert=upsert)
+
+@pytest.mark.parametrize('upsert', [False, True])
+def test_upload_with_errors_is_rejected(no_stored_students, upsert):
+    body, status = _upload('nombre_estudiante,anio_inicio,NUE\nAna,abc,1\nLuis,2020,2\n', upsert)
+    
+    assert status == 400
+    assert (body['valid'], body['valid_count']) == (False, 1)
+    assert [error['field'] for error in body['errors']] == ['anio_inicio']
+
+@pytest.mark.parametrize('upsert', [False, True])
+def test_upload_without_students_is_rejected(no_stored_students, upsert):
+    body, status = _upload('nombre_estudiante,anio_inicio,NUE\n', upsert)
+    
+    assert status == 400
+    assert body['errors'] == [{'row': 0, 'field': 'file', 'value': '',
+                               'message': 'No hay estudiantes válidos en el archivo'}]
+
+@pytest.mark.parametrize('upsert', [False, True])
+def test_unreadable_upload_reports_file_error(no_stored_students, upsert):
+    body, status = _upload('nombre_estudiante,anio_inicio,NUE\n"Ana,2020,1\n', upsert)
+    
+    assert status == 400
+    assert body['errors'][0]['field'] == 'file'
+    assert body['errors'][0]['message'].startswith('Error al leer el archivo: ')
@@ -0,0 +1,144 @@
+"""
+StudentModel contra una tabla students en memoria que compara los nombres
+como la collation utf8mb4_unicode_ci (sin distinguir mayúsculas ni acentos)
+"""
+import copy
+import unicodedata
+from contextlib import contextmanager
+import pytest
+
+from models import student_model
+from models.student_model import StudentModel
+
+def collate(nombre):
+    decomposed = unicodedata.normalize('NFKD', nombre)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+class FakeTable:
+    def __init__(self, rows):
+        self.rows = {row['nue']: row for row in rows}
+        self.stats = {}
+        self._committed = copy.deepcopy((self.rows, self.stats))
+
+    def by_nombre(self, nombre):
+        return next((row for row in self.rows.values()
+                     if collate(row['nombre_estudiante']) == collate(nombre)), None)
+
+    def commit(self):
+        self._committed = copy.deepcopy((self.rows, self.stats))
+
+    def rollback(self):
+        self.rows, self.stats = copy.deepcopy(self._committed)
+
+class FakeCursor:
+    def __init__(self, table):
+        self.table = table
+        self.result = []
+
+    def execute(self, query, params=()):
+        assert 'FOR UPDATE' in query
+        half = len(params) // 2
+        nues, nombres = set(params[:half]), {collate(n) for n in params[half:]}
+        self.result = [dict(row) for row in self.table.rows.values()
+                       if row['nue'] in nues or collate(row['nombre_estudiante']) in nombres]
+
+    def executemany(self, query, seq_params):
+        for params in seq_params:
+            if 'student_stats' in query:
+                graduado, anio, count, total, promedios = params
+                self.table.stats[(graduado, anio)] = self.table.stats.get((graduado, anio), 0) + count
+                continue
+            nombre, nue, anio, actual, graduacion, graduado, content_hash = params
+            owner = self.table.by_nombre(nombre)
+            if nue not in self.table.rows and owner is not None:
+                # ON DUPLICATE KEY UPDATE por la llave única del nombre
+                del self.table.rows[owner['nue']]
+                nue = owner['nue']
+            self.table.rows[nue] = {'nue': nue, 'nombre_estudiante': nombre, 'anio_inicio': anio,
+                                    'promedio_actual': actual, 'graduado': graduado,
+                                    'content_hash': content_hash}
+
+    def fetchall(self):
+        return self.result
+
+    def close(self):
+        pass
+
+class FakeConnection:
+    def __init__(self, table):
+        self.table = table
+
+    def cursor(self, dictionary=False):
+        return FakeCursor(self.table)
+
+    def commit(self):
+        self.table.commit()
+
+    def rollback(self):
+        self.table.rollback()
+
+class FakeDb:
+    def __init__(self, table):
+        self.table = table
+
+    @contextmanager
+    def connection(self):
+        yield FakeConnection(self.table)
+
+def student(nombre, nue, anio=2020):
+    return {'nombre_estudiante': nombre, 'nue': nue, 'anio_inicio': anio, 'promedio_actual': None,
+            'promedio_graduacion': None, 'graduado': False}
+
+@pytest.fixture
+def table(monkeypatch):
+    stored = student('Jose Perez', 1)
+    table = FakeTable([dict(stored, content_hash=StudentModel.content_hash(stored))])
+    monkeypatch.setattr(student_model, 'db', FakeDb(table))
+    return table
+
+def test_upsert_rejects_name_of_another_nue_under_collation(table):
+    result = StudentModel.upsert_students_bulk(
+        [student('Ana', 2), student('José Pérez', 3), student('Luis', 4)], chunk_size=10)
+    
+    assert result['inserted'] == 2
+    assert [error['student'] for error in result['errors']] == ['José Pérez']
+    assert table.rows[1]['nombre_estudiante'] == 'Jose Perez'
+    assert sorted(table.rows) == [1, 2, 4]
+    assert table.stats == {(0, 2020): 2}
+
+def test_upsert_updates_row_with_same_nue(table):
+    result = StudentModel.upsert_students_bulk([student('José Pérez', 1, anio=2021)])
+    
+    assert (result['updated'], result['errors']) == (1, [])
+    assert table.rows[1]['nombre_estudiante'] == 'José Pérez'
+    assert table.stats == {(0, 2020): -1, (0, 2021): 1}
+
+@pytest.fixture
+def searches(monkeypatch):
+    queries = []
+    
+    def fetch_search(query, params):
+        queries.append((query, params))
+        return []
+    
+    monkeypatch.setattr(StudentModel, '_fetch_search', staticmethod(fetch_search))
+    return queries
+
+@pytest.mark.parametrize('prefix', ['99999999999999999999', str(StudentModel.NUE_MAX + 1),
+                                    '0123', '00', '12a', '²'])
+def test_search_by_nue_prefix_without_possible_match(searches, prefix):
+    assert StudentModel.search_by_nue_prefix(prefix, 10) == []
+    assert searches == []
+
+def test_search_by_nue_prefix_ranges(searches):
+    StudentModel.search_by_nue_prefix('0', 10)
+    StudentModel.search_by_nue_prefix(str(StudentModel.NUE_MAX), 10)
+    StudentModel.search_by_nue_prefix('92233720368547758', 10)
+    
+    assert [params for _, params in searches] == [
+        (0, 0, 10),
+        (StudentModel.NUE_MAX, StudentModel.NUE_MAX, 10),
+        (92233720368547758, 92233720368547758, 922337203685477580, 922337203685477589,
+         9223372036854775800, StudentModel.NUE_MAX, 10)
+    ]
+    assert all('WHERE nue BETWEEN' in query for query, _ in searches)
@@ -0,0 +1,91 @@
+"""
+Paridad de la validación por columnas con la validación fila por fila
+original, y de los caminos paralelo y por bloques con la lectura completa
+"""
+import random
+import numpy as np
+import pandas as pd
+import pytest
+
+from controllers.student_controller import StudentController
+from services.validation_pool import validation_pool
+from tests.conftest import EXISTING_NOMBRES, EXISTING_NUES, assert_same_records, find_existing
+
+pytestmark = pytest.mark.usefixtures('stub_database')
+
+def _run(validate, df):
+    valid, errors = [], []
+    try:
+        validate(df.copy(), valid, errors)
+    except Exception as e:
+        # Ambos caminos deben fallar con la misma excepción (p. ej. OverflowError)
+        return valid, errors, (type(e), str(e))
+    return valid, errors, None
+
+def _random_frame(rng):
+    names = ['Ana', 'Luis', ' Ana ', '', float('nan'), 'nan', 'Pedro', 'Eva', 12, 'X']
+    anios = [2020, 2019.5, '2021', 'abc', float('nan'), 3000, 'nan', ' 2018 ', True, '1e3', 'inf']
+    nues = [1, 2, 3, '4', 4.7, 'x', float('nan'), 'nan', 99, 10 ** 20, float('-inf')]
+    promedios = [8.5, '8.5', '', '  ', float('nan'), 'abc', 9, 'nan', 8.505]
+    estados = ['graduado', 'Graduado ', 'activo', '', float('nan')]
+    
+    n = rng.randint(0, 25)
+    if n and rng.random() < 0.2:
+        # Solo columnas numéricas: iterrows convierte las enteras a float
+        return pd.DataFrame({'nombre_estudiante': np.arange(n), 'anio_inicio': np.full(n, 2020),
+                             'NUE': np.arange(n) % 3, 'promedio_actual': np.linspace(1, 2, n)})
+    columns = {
+        'nombre_estudiante': [rng.choice(names) for _ in range(n)],
+        'anio_inicio': [rng.choice(anios) for _ in range(n)],
+        'NUE': [rng.choice(nues) for _ in range(n)]
+    }
+    for name, values in (('estado', estados), ('promedio_actual', promedios),
+                         ('promedio_graduacion', promedios)):
+        if rng.random() < 0.8:
+            columns[name] = [rng.choice(values) for _ in range(n)]
+    df = pd.DataFrame(columns)
+    return df.infer_objects() if rng.random() < 0.5 else df
+
+def test_vectorized_matches_row_loop():
+    rng = random.Random(0)
+    for _ in range(2000):
+        df = _random_frame(rng)
+        rows = _run(lambda d, v, e: StudentController._validate_rows(
+            d, set(EXISTING_NOMBRES), set(EXISTING_NUES), v, e), df)
+        columns = _run(lambda d, v, e: StudentController._validate_columns(d, find_existing, v, e), df)
+        
+        assert rows[2] == columns[2], df
+        assert_same_records(rows[0], columns[0])
+        assert_same_records(rows[1], columns[1])
+
+@pytest.fixture
+def roster_path(roster, tmp_path):
+    path = tmp_path / 'roster.csv'
+    roster.to_csv(path, index=False)
+    return str(path)
+
+def test_parallel_matches_sequential(roster_path, monkeypatch):
+    monkeypatch.setattr(validation_pool, 'workers', 2)
+    try:
+        sequential = StudentController.validate_excel_file(roster_path, parallel=False)
+        parallel = StudentController.validate_excel_file(roster_path, parallel=True)
+    finally:
+        validation_pool.shutdown()
+    
+    assert_same_records(sequential[0], parallel[0])
+    assert_same_records(sequential[1], parallel[1])
+
+def test_streaming_matches_full_file(roster_path, monkeypatch):
+    inserted = []
+    
+    def insert_students(students, mode=None, chunk_size=None, progress=None, atomic=False):
+        inserted.extend(students)
+        return {'inserted': len(students), 'errors': []}
+    
+    monkeypatch.setattr(StudentController, 'insert_students', staticmethod(insert_students))
+    valid, errors = StudentController.validate_excel_file(roster_path)
+    result = StudentController.import_file_streaming(roster_path, chunk_rows=250)
+    
+    assert result['rows'] == 3000
+    assert_same_records(valid, inserted)
+    assert_same_records(errors, result['errors'])
@@ -75,10 +75,10 @@ const DashboardPage: React.FC = () => {
     try {
       const [statsResponse, studentsResponse] = await Promise.all([
         axios.get("/dashboard/statistics"),
-        axios.get("/dashboard/students"),
+        axios.get("/dashboard/students", { params: { limit: 50 } }),
       ]);
       setStatistics(statsResponse.data);
-      setStudents(studentsResponse.data);
+      setStudents(studentsResponse.data.items);
     } catch (error) {
       console.error("Error fetching data:", error);
     } finally {
@@ -13,6 +13,8 @@ import {
   TableHead,
   TableRow,
   CircularProgress,
+  Checkbox,
+  FormControlLabel,
   AppBar,
   Toolbar,
   IconButton,
@@ -33,34 +35,68 @@ interface ValidationError {
   message: string;
 }
 
+interface FileResult {
+  filename: string;
+  errors?: ValidationError[];
+  error_count?: number;
+  report_id?: string;
+}
+
+const JOB_POLL_INTERVAL_MS = 500;
+
 const UploadPage: React.FC = () => {
-  const [file, setFile] = useState<File | null>(null);
+  const [files, setFiles] = useState<File[]>([]);
   const [loading, setLoading] = useState(false);
   const [errors, setErrors] = useState<ValidationError[]>([]);
+  const [errorCount, setErrorCount] = useState(0);
+  const [reportId, setReportId] = useState<string | null>(null);
+  const [upsert, setUpsert] = useState(false);
   const [success, setSuccess] = useState<string | null>(null);
   const navigate = useNavigate();
   const dispatch = useDispatch<AppDispatch>();
+  const isBatch =
+    files.length > 1 ||
+    (files.length === 1 && files[0].name.toLowerCase().endsWith(".zip"));
 
   const handleFileChange = (e: React.ChangeEvent<HTMLInputElement>) => {
-    if (e.target.files && e.target.files[0]) {
-      setFile(e.target.files[0]);
+    if (e.target.files && e.target.files.length > 0) {
+      setFiles(Array.from(e.target.files));
       setErrors([]);
+      setErrorCount(0);
+      setReportId(null);
       setSuccess(null);
     }
   };
 
+  const waitForJob = async (jobId: string) => {
+    while (true) {
+      const { data } = await axios.get(`/students/jobs/${jobId}`);
+      if (data.status === "completed" || data.status === "failed") {
+        return data;
+      }
+      await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+    }
+  };
+
   const handleUpload = async () => {
-    if (!file) {
+    if (files.length === 0) {
       alert("Por favor seleccione un archivo");
       return;
     }
 
     setLoading(true);
     setErrors([]);
+    setErrorCount(0);
+    setReportId(null);
     setSuccess(null);
 
     const formData = new FormData();
-    formData.append("file", file);
+    // Varios archivos (o un .zip) se importan como un solo lote
+    files.forEach((selected) => formData.append("file", selected));
+    if (upsert && !isBatch) {
+      // Actualiza por NUE los estudiantes existentes en lugar de rechazarlos
+      formData.append("mode", "upsert");
+    }
 
     try {
       const response = await axios.post("/students/upload", formData, {
@@ -69,14 +105,46 @@ const UploadPage: React.FC = () => {
         },
       });
 
-      if (response.data.success) {
-        setSuccess(response.data.message || "Archivo procesado exitosamente");
-        setFile(null);
+      // La importación corre en segundo plano; consultar el trabajo hasta que termine
+      const job = await waitForJob(response.data.job_id);
+      const result = job.result || {};
+
+      if (job.status_code === 200 && result.success) {
+        setSuccess(result.message || "Archivo procesado exitosamente");
+        setFiles([]);
         // Reset file input
         const fileInput = document.getElementById(
           "file-upload"
         ) as HTMLInputElement;
         if (fileInput) fileInput.value = "";
+      } else if (result.files && !result.errors) {
+        // Lote con errores: se muestran los de cada archivo, indicando cuál
+        const fileResults: FileResult[] = result.files;
+        const withErrors = fileResults.filter((item) => item.errors);
+        setErrors(
+          withErrors.flatMap((item) =>
+            (item.errors || []).map((error) => ({
+              ...error,
+              message: `${item.filename}: ${error.message}`,
+            }))
+          )
+        );
+        setErrorCount(result.error_count || 0);
+        setReportId(withErrors.find((item) => item.report_id)?.report_id || null);
+      } else if (result.errors) {
+        setErrors(result.errors);
+        // Los archivos con muchos errores solo traen los primeros; el resto va en el reporte
+        setErrorCount(result.error_count || result.errors.length);
+        setReportId(result.report_id || null);
+      } else {
+        setErrors([
+          {
+            row: 0,
+            field: "file",
+            value: "",
+            message: result.error || "Error al procesar el archivo",
+          },
+        ]);
       }
     } catch (error: any) {
       if (error.response?.data?.errors) {
@@ -97,6 +165,19 @@ const UploadPage: React.FC = () => {
     }
   };
 
+  const downloadReport = async () => {
+    if (!reportId) return;
+    const { data } = await axios.get(`/students/reports/${reportId}`, {
+      responseType: "blob",
+    });
+    const url = URL.createObjectURL(data);
+    const link = document.createElement("a");
+    link.href = url;
+    link.download = `errores_${reportId}.csv`;
+    link.click();
+    URL.revokeObjectURL(url);
+  };
+
   const handleLogout = () => {
     dispatch(logout());
     navigate("/login");
@@ -126,12 +207,14 @@ const UploadPage: React.FC = () => {
             Seleccione un archivo Excel (.xlsx, .xls) o CSV con los datos de los
             estudiantes. El archivo debe contener las columnas:
             nombre_estudiante, anio_inicio, NUE, promedio_actual,
-            promedio_graduacion, estado.
+            promedio_graduacion, estado. Puede seleccionar varios archivos o un
+            .zip; se importan juntos y solo se guardan si ninguno tiene errores.
           </Typography>
 
           <Box sx={{ mt: 3, mb: 3 }}>
             <input
-              accept=".xlsx,.xls,.csv"
+              accept=".xlsx,.xls,.csv,.zip"
+              multiple
               style={{ display: "none" }}
               id="file-upload"
               type="file"
@@ -144,20 +227,32 @@ const UploadPage: React.FC = () => {
                 startIcon={<UploadFileIcon />}
                 disabled={loading}
               >
-                Seleccionar Archivo
+                Seleccionar Archivos
               </Button>
             </label>
-            {file && (
+            {files.length > 0 && (
               <Typography variant="body2" sx={{ mt: 1 }}>
-                Archivo seleccionado: {file.name}
+                {files.length === 1 ? "Archivo seleccionado" : "Archivos seleccionados"}:{" "}
+                {files.map((selected) => selected.name).join(", ")}
               </Typography>
             )}
+            <FormControlLabel
+              control={
+                <Checkbox
+                  checked={upsert}
+                  onChange={(e) => setUpsert(e.target.checked)}
+                  disabled={loading || isBatch}
+                />
+              }
+              label="Actualizar estudiantes existentes (por NUE)"
+              sx={{ display: "block", mt: 1 }}
+            />
           </Box>
 
           <Button
             variant="contained"
             onClick={handleUpload}
-            disabled={!file || loading}
+            disabled={files.length === 0 || loading}
             startIcon={
               loading ? <CircularProgress size={20} /> : <UploadFileIcon />
             }
@@ -175,8 +270,17 @@ const UploadPage: React.FC = () => {
           {errors.length > 0 && (
             <Box sx={{ mt: 3 }}>
               <Typography variant="h6" color="error" gutterBottom>
-                Errores de Validación ({errors.length})
+                Errores de Validación (
+                {errorCount > errors.length
+                  ? `${errors.length} de ${errorCount}`
+                  : errors.length}
+                )
               </Typography>
+              {reportId && (
+                <Button variant="outlined" onClick={downloadReport} sx={{ mb: 2 }}>
+                  Descargar todos los errores (CSV)
+                </Button>
+              )}
               <TableContainer component={Paper} variant="outlined">
                 <Table>
                   <TableHead>